@@ -1,12 +1,53 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, g, abort, jsonify, make_response, send_from_directory, stream_template, has_request_context
+from flask import logging as flask_logging
+from flask.signals import before_render_template, template_rendered
 from flask_wtf.csrf import CSRFProtect, generate_csrf
+import click
 import re
 import sqlite3
 from sqlite3 import Error
 import os
+import threading
+import time
+import zlib
+import bisect
+import csv
+import functools
+import itertools
+import hashlib
+import hmac
+import gzip
+import io
+import mimetypes
+import posixpath
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+import atexit
+import contextvars
+import http.client
+import multiprocessing
+import resource
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from markupsafe import Markup, escape
+
+try:
+    import brotli
+except ImportError:  # optional: responses fall back to gzip
+    brotli = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,121 +57,2071 @@ app = Flask(__name__, static_folder='static')
 app.secret_key = os.getenv('SECRET_KEY')  # Required for session management
 csrf = CSRFProtect(app)  # Enable CSRF protection
 
+# Logging: the request path only enqueues records; a listener thread does the
+# writing, so a slow or blocked stderr pipe never stalls a worker. Every record
+# carries the request id (X-Request-ID, echoed back on the response).
+# LOG_SAMPLE_RATES="endpoint=rate,..." keeps only that share of a route's
+# INFO/DEBUG records, e.g. "static=0,collection=0.1"; warnings always pass.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records beyond this are dropped
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(request_id)s] %(message)s'
+LOG_SAMPLE_RATES = {
+    endpoint.strip(): float(rate)
+    for endpoint, _, rate in (item.partition('=') for item in os.getenv('LOG_SAMPLE_RATES', '').split(','))
+    if endpoint.strip()
+}
+ACCESS_LOG = os.getenv('ACCESS_LOG', '1') != '0'
+
+log = app.logger
+_log_handler = logging.handlers.QueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+_log_listener = None
+_log_dropped = 0
+
+
+def _log_context(record):
+    """Handler filter, run on the emitting thread: tag the request id, apply sampling, drop on overflow."""
+    global _log_dropped
+    if has_request_context():
+        record.request_id = g.get('request_id', '-')
+        if record.levelno < logging.WARNING and not g.get('log_sampled', True):
+            return False
+    else:
+        record.request_id = '-'
+    if _log_handler.queue.full():
+        _log_dropped += 1
+        return False
+    return True
+
+
+def start_log_listener():
+    """Start the thread that drains the log queue to stderr (again in each forked worker)."""
+    global _log_listener
+    _log_handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    _log_listener = logging.handlers.QueueListener(_log_handler.queue, stream)
+    _log_listener.start()
+
+
+def stop_log_listener():
+    """Flush what is queued; called at exit."""
+    if _log_listener is not None and _log_listener._thread is not None:
+        _log_listener.stop()
+    if _log_dropped:
+        sys.stderr.write(f"{_log_dropped} log records were dropped because the log queue was full.\n")
+
+
+_log_handler.addFilter(_log_context)
+log.removeHandler(flask_logging.default_handler)
+log.addHandler(_log_handler)
+log.setLevel(LOG_LEVEL)
+log.propagate = False
+start_log_listener()
+os.register_at_fork(after_in_child=start_log_listener)
+atexit.register(stop_log_listener)
+
+
+@app.before_request
+def start_request_log():
+    g.request_id = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex[:16]
+    rate = LOG_SAMPLE_RATES.get(request.endpoint, 1.0)
+    g.log_sampled = rate >= 1 or random.random() < rate
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def finish_request_log(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '-')
+    if ACCESS_LOG:
+        # Streamed bodies have no length yet; they are logged as '-'
+        log.info("%s %s %s %.1fms %s", request.method, request.full_path.rstrip('?'), response.status_code,
+                 (time.perf_counter() - g.request_started) * 1000, response.content_length or '-')
+    return response
+
 # Ensure the instance folder exists
 INSTANCE_FOLDER = os.path.join(app.root_path, 'instance')
 if not os.path.exists(INSTANCE_FOLDER):
     os.makedirs(INSTANCE_FOLDER)
 
-# SQLite database file (stored in the instance folder)
-DATABASE = os.path.join(INSTANCE_FOLDER, 'museum.db')
+# SQLite database file (stored in the instance folder; DATABASE_PATH points elsewhere, e.g. for benchmarks)
+DATABASE = os.getenv('DATABASE_PATH') or os.path.join(INSTANCE_FOLDER, 'museum.db')
 
 # Regular expressions for validation
 EMAIL_REGEX = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
 PASSWORD_REGEX = r'^(?=.*\d)(?=.*[!@#$%^&*])(?=.*[a-zA-Z]).{8,}$'
 
+# SQLite tuning applied once to every new connection
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),       # readers no longer block the writer
+    ('synchronous', 'NORMAL'),     # safe with WAL, avoids an fsync per commit
+    ('mmap_size', 268435456),      # 256 MB memory-mapped reads
+    ('cache_size', -65536),        # 64 MB page cache (negative = KiB)
+    ('busy_timeout', 5000),        # wait up to 5s for a lock instead of failing
+)
+
+# Connections are reused per worker thread (sqlite3 objects are not shareable across threads)
+_thread_local = threading.local()
+
+# Guards the in-process query caches, which are shared by every thread in the worker
+_cache_lock = threading.Lock()
+
+# Slow-query log: statements whose execute step takes SLOW_QUERY_MS or more
+# (0 turns it off) are logged with their normalised SQL, parameter types,
+# duration and endpoint, plus EXPLAIN QUERY PLAN the first time each one is
+# seen, and aggregated for the /adminSlowQueries page.
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 50))
+SLOW_QUERY_MAX_ENTRIES = 500  # distinct statements remembered; later newcomers are only logged
+
+_slow_queries = {}  # normalised SQL -> aggregate dict
+_slow_queries_lock = threading.Lock()
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'REPLACE', 'UPDATE', 'DELETE')
+_SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals with ? so variants of a statement group together."""
+    return _SQL_LITERAL.sub('?', ' '.join(sql.split()))
+
+
+def parameter_shape(parameters):
+    """Describe statement parameters by type only (the values may be personal data)."""
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return 'many'
+
+
+def record_slow_query(conn, sql, parameters, elapsed, many=False):
+    """Log a slow statement and fold it into the worst-offenders table."""
+    key = normalize_sql(sql)
+    endpoint = (request.endpoint or 'none') if has_request_context() else 'cli'
+    shape = 'many' if many else parameter_shape(parameters)
+    with _slow_queries_lock:
+        entry = _slow_queries.get(key)
+        if entry is None and len(_slow_queries) < SLOW_QUERY_MAX_ENTRIES:
+            entry = _slow_queries[key] = {'sql': key, 'count': 0, 'total': 0.0, 'max': 0.0,
+                                          'params': shape, 'endpoints': set(), 'plan': None}
+        first = entry is not None and entry['count'] == 0
+        if entry is not None:
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            entry['endpoints'].add(endpoint)
+
+    plan = None
+    if first and not many and key.split(' ', 1)[0].upper() in _EXPLAINABLE:
+        try:
+            # Bypasses the instrumented execute, so the EXPLAIN is not itself timed
+            rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+            plan = '\n'.join(row[-1] for row in rows)
+            entry['plan'] = plan
+        except Error as e:
+            plan = f"(no plan: {e})"
+    log.warning("Slow query (%.1f ms, %s, params %s): %s%s", elapsed * 1000, endpoint, shape, key,
+                f"\n{plan}" if plan else '')
+
+
+# Every statement goes through these thin sqlite3 subclasses, which add its
+# count and execution time to the current request's tally (see request metrics)
+# and report it to the slow-query log when it crosses SLOW_QUERY_MS.
+def _timed(run, sql, parameters, many=False):
+    started = time.perf_counter()
+    try:
+        return run(sql, parameters)
+    finally:
+        elapsed = time.perf_counter() - started
+        tally = getattr(_thread_local, 'sql', None)
+        if tally is not None:
+            tally[0] += 1
+            tally[1] += elapsed
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            record_slow_query(run.__self__.connection, sql, parameters, elapsed, many)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return _timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return _timed(super().executemany, sql, seq_of_parameters, many=True)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
 # Database connection and initialization functions
 def create_connection():
-    """Create a connection to the SQLite database."""
+    """Open a new connection to the SQLite database with the tuned pragmas applied."""
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE)
-        print(f"Connected to SQLite database: {DATABASE}")
+        conn = sqlite3.connect(DATABASE, factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in SQLITE_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma} = {value}")
     except Error as e:
-        print(f"Error connecting to database: {e}")
+        log.error("Error connecting to database: %s", e)
     return conn
 
 
-def init_db():
-    """Initialize the database and create tables if they don't exist."""
+def get_db():
+    """Return the connection for the current app context, reusing this thread's connection."""
+    if 'db' not in g:
+        conn = getattr(_thread_local, 'conn', None)
+        if conn is None or getattr(_thread_local, 'pid', None) != os.getpid():
+            conn = create_connection()
+            _thread_local.conn = conn
+            _thread_local.pid = os.getpid()
+            ensure_schema(conn)
+        if conn is not None:
+            sync_caches(conn)
+        g.db = conn
+    return g.db
+
+
+def sync_caches(conn):
+    """Drop in-process caches if another connection (thread or worker) has committed since we last looked."""
+    # data_version only moves for commits made through *other* connections;
+    # writes on this connection invalidate explicitly at the call site.
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if getattr(_thread_local, 'data_version', None) == version:
+        return
+    _thread_local.data_version = version
+    # Only commits that touched the catalogue tables bump their data_versions rows;
+    # anything else (a user registering, say) leaves the caches alone
+    versions = dict(conn.execute("SELECT name, version FROM data_versions").fetchall())
+    seen = getattr(_thread_local, 'table_versions', {})
+    _thread_local.table_versions = versions
+    if seen.get('artifacts') != versions.get('artifacts'):
+        invalidate_category_cache()
+    if seen.get('exhibitions') != versions.get('exhibitions'):
+        invalidate_exhibition_cache()
+    if _suggest_versions is not None and any(_suggest_versions.get(table) != versions.get(table)
+                                             for table in SUGGEST_SOURCES):
+        invalidate_suggestions()
+
+
+@app.teardown_appcontext
+def release_db(exception):
+    """Hand the connection back to the thread, discarding any transaction left open."""
+    conn = g.pop('db', None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+
+def slugify(text):
+    """Turn a display name into a lower-case, underscore-separated URL slug."""
+    return re.sub(r'[^a-z0-9]+', '_', (text or '').lower()).strip('_') or 'exhibition'
+
+
+def unique_exhibition_slug(cursor, exhibit_name):
+    """Return a slug for exhibit_name that no other exhibition uses yet."""
+    base = slugify(exhibit_name)
+    slug, n = base, 2
+    while cursor.execute("SELECT 1 FROM exhibitions WHERE slug = ?", (slug,)).fetchone():
+        slug, n = f"{base}_{n}", n + 1
+    return slug
+
+
+def backfill_exhibition_slugs(cursor):
+    """Give every exhibition without a slug one, reusing the URLs of the hand-built pages."""
+    known = {name: slug for slug, name in EXHIBITION_PAGES.items()}
+    rows = cursor.execute("SELECT id, exhibit_name FROM exhibitions WHERE slug IS NULL ORDER BY id").fetchall()
+    for exhibit_id, exhibit_name in rows:
+        slug = known.pop(exhibit_name, None) or unique_exhibition_slug(cursor, exhibit_name)
+        cursor.execute("UPDATE exhibitions SET slug = ? WHERE id = ?", (slug, exhibit_id))
+
+
+# How the object galleries picked their rows before exhibition_id existed:
+# exhibition slug -> (exhibition_objects column, value). Used once by the backfill.
+LEGACY_OBJECT_FILTERS = {
+    'caspar_david_friedrich': ('creator', 'Caspar David Friedrich'),
+    'cycladic_art': ('creator', 'Cycladic Art'),
+    'layered_narratives': ('creator', 'Layered narratives'),
+    'recasting_the_past': ('culture', 'China'),
+    'colorful_korea': ('culture', 'South Korea'),
+    'before_yesterday_we_could_fly': ('culture', 'Europe'),
+    'art_of_native_america': ('culture', 'Native America'),
+    'embracing_color': ('culture', 'Chinese Decoratives'),
+}
+
+
+def backfill_exhibition_object_links(cursor):
+    """Point existing exhibition objects at the exhibition whose gallery used to show them."""
+    for slug, (column, value) in LEGACY_OBJECT_FILTERS.items():
+        cursor.execute(f"""
+            UPDATE exhibition_objects
+            SET exhibition_id = (SELECT id FROM exhibitions WHERE slug = ?)
+            WHERE {column} = ? AND exhibition_id IS NULL
+        """, (slug, value))
+
+
+# Sources of the full-text search index: table -> (kind, title, details, description).
+# {r} is the row prefix ('NEW.' inside triggers). Index rowids are
+# id * SEARCH_KINDS + kind, so a row's entry is found without scanning the index.
+SEARCH_SOURCES = {
+    'artifacts': (
+        0, "{r}item_name",
+        "coalesce({r}origin, '') || ' ' || coalesce({r}historical_period, '')",
+        "{r}description",
+    ),
+    'exhibitions': (1, "{r}exhibit_name", "''", "{r}description"),
+    'exhibition_objects': (
+        2, "{r}title",
+        "coalesce({r}creator, '') || ' ' || coalesce({r}culture, '') || ' ' || coalesce({r}medium, '')",
+        "{r}description",
+    ),
+}
+SEARCH_KINDS = len(SEARCH_SOURCES)
+
+
+def search_index_statements():
+    """Return the SQL that fills the search index and the triggers that keep it in sync."""
+    statements = []
+    for table, (kind, title, details, description) in SEARCH_SOURCES.items():
+        rowid = f"{{r}}id * {SEARCH_KINDS} + {kind}"
+        values = ', '.join((rowid, title, details, description))
+        statements += [
+            f"""
+            INSERT INTO search_index (rowid, title, details, description)
+            SELECT {values.format(r='')} FROM {table}
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO search_index (rowid, title, details, description)
+                VALUES ({values.format(r='NEW.')});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {rowid.format(r='OLD.')};
+                INSERT INTO search_index (rowid, title, details, description)
+                VALUES ({values.format(r='NEW.')});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {rowid.format(r='OLD.')};
+            END
+            """,
+        ]
+    return statements
+
+
+# Tables whose writes bump a counter in data_versions
+VERSIONED_TABLES = ('artifacts', 'exhibitions', 'exhibition_objects')
+
+
+# Recounts every row counter in the stats table from scratch
+STATS_REFRESH = """
+    INSERT OR REPLACE INTO stats (name, value)
+    SELECT 'users', COUNT(*) FROM users
+    UNION ALL SELECT 'admins', COUNT(*) FROM admins
+    UNION ALL SELECT 'artifacts', COUNT(*) FROM artifacts
+    UNION ALL SELECT 'exhibition_objects', COUNT(*) FROM exhibition_objects
+    UNION ALL SELECT 'events', COUNT(*) FROM exhibitions WHERE category = 'Events'
+    UNION ALL SELECT 'exhibitions', COUNT(*) FROM exhibitions WHERE category != 'Events'
+"""
+
+
+# Numbered schema migrations. MIGRATIONS[n - 1] brings the database to
+# PRAGMA user_version = n; each entry is a list of SQL statements or
+# callables taking the cursor. Only ever append new migrations.
+MIGRATIONS = [
+    # 1: base schema (IF NOT EXISTS so databases created before versioning adopt it)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            phone_number TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            address_line1 TEXT NOT NULL,
+            address_line2 TEXT,
+            city TEXT NOT NULL,
+            zip_code TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS admins (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS exhibitions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exhibit_name TEXT NOT NULL,
+            location TEXT NOT NULL,
+            category TEXT NOT NULL,
+            image_filename TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            opening_time TEXT NOT NULL,
+            closing_time TEXT NOT NULL,
+            description TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            historical_period TEXT NOT NULL,
+            location TEXT NOT NULL,
+            image_filename TEXT NOT NULL,
+            description TEXT,
+            category_desc TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS exhibition_objects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            creator TEXT NOT NULL,
+            culture TEXT,
+            date TEXT NOT NULL,
+            medium TEXT,
+            dimensions TEXT,
+            credit TEXT NOT NULL,
+            description TEXT,
+            image_filename TEXT NOT NULL
+        )
+        """,
+    ],
+    # 2: indexes for the columns the public pages filter on
+    [
+        "CREATE INDEX IF NOT EXISTS idx_artifacts_category ON artifacts (category)",
+        "CREATE INDEX IF NOT EXISTS idx_exhibitions_exhibit_name ON exhibitions (exhibit_name)",
+        "CREATE INDEX IF NOT EXISTS idx_exhibitions_category ON exhibitions (category)",
+        "CREATE INDEX IF NOT EXISTS idx_exhibition_objects_creator ON exhibition_objects (creator)",
+        "CREATE INDEX IF NOT EXISTS idx_exhibition_objects_culture ON exhibition_objects (culture)",
+    ],
+    # 3: URL slugs for exhibitions
+    [
+        "ALTER TABLE exhibitions ADD COLUMN slug TEXT",
+        backfill_exhibition_slugs,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_exhibitions_slug ON exhibitions (slug)",
+    ],
+    # 4: link exhibition objects to their exhibition instead of matching creator/culture text
+    [
+        "ALTER TABLE exhibition_objects ADD COLUMN exhibition_id INTEGER REFERENCES exhibitions (id)",
+        backfill_exhibition_object_links,
+        "CREATE INDEX IF NOT EXISTS idx_exhibition_objects_exhibition_id ON exhibition_objects (exhibition_id, id)",
+    ],
+    # 5: row counters kept current by triggers so the dashboard never counts tables
+    [
+        """
+        CREATE TABLE IF NOT EXISTS stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        STATS_REFRESH,
+        *[
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_{event} AFTER {event.upper()} ON {table}
+            BEGIN
+                UPDATE stats SET value = value {sign} 1 WHERE name = '{table}';
+            END
+            """
+            for table in ('users', 'admins', 'artifacts', 'exhibition_objects')
+            for event, sign in (('insert', '+'), ('delete', '-'))
+        ],
+        """
+        CREATE TRIGGER IF NOT EXISTS exhibitions_stats_insert AFTER INSERT ON exhibitions
+        BEGIN
+            UPDATE stats SET value = value + 1
+            WHERE name = CASE WHEN NEW.category = 'Events' THEN 'events' ELSE 'exhibitions' END;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS exhibitions_stats_delete AFTER DELETE ON exhibitions
+        BEGIN
+            UPDATE stats SET value = value - 1
+            WHERE name = CASE WHEN OLD.category = 'Events' THEN 'events' ELSE 'exhibitions' END;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS exhibitions_stats_update AFTER UPDATE OF category ON exhibitions
+        WHEN (OLD.category = 'Events') != (NEW.category = 'Events')
+        BEGIN
+            UPDATE stats SET value = value - 1
+            WHERE name = CASE WHEN OLD.category = 'Events' THEN 'events' ELSE 'exhibitions' END;
+            UPDATE stats SET value = value + 1
+            WHERE name = CASE WHEN NEW.category = 'Events' THEN 'events' ELSE 'exhibitions' END;
+        END
+        """,
+    ],
+    # 6: full-text search index over the three catalogue tables, kept in sync by triggers
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, details, description,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """,
+        # Rank titles above creator/origin details above body text
+        "INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')",
+        *search_index_statements(),
+    ],
+    # 7: per-table change counters that version the rendered-page cache
+    [
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        *[
+            f"INSERT OR IGNORE INTO data_versions (name, updated_at) VALUES ('{table}', strftime('%s', 'now'))"
+            for table in VERSIONED_TABLES
+        ],
+        *[
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_version_{event} AFTER {event.upper()} ON {table}
+            BEGIN
+                UPDATE data_versions SET version = version + 1, updated_at = strftime('%s', 'now')
+                WHERE name = '{table}';
+            END
+            """
+            for table in VERSIONED_TABLES
+            for event in ('insert', 'update', 'delete')
+        ],
+    ],
+    # 8: the API's origin filter, walked in id order for keyset pages
+    [
+        "CREATE INDEX IF NOT EXISTS idx_artifacts_origin_id ON artifacts (origin, id)",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_migrate_lock = threading.Lock()
+_schema_ready = False
+
+
+def migrate_db(conn):
+    """Apply any migrations newer than the database's user_version, each in its own transaction."""
+    applied = []
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    while version < SCHEMA_VERSION:
+        cursor = conn.cursor()
+        try:
+            # Take the write lock first so concurrent workers cannot apply the same step twice
+            cursor.execute("BEGIN IMMEDIATE")
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                break
+            for step in MIGRATIONS[version]:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            version += 1
+            cursor.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            applied.append(version)
+        except Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return applied
+
+
+def ensure_schema(conn):
+    """Bring the schema up to date the first time this process touches the database."""
+    global _schema_ready
+    if _schema_ready or conn is None:
+        return
+    with _migrate_lock:
+        if not _schema_ready:
+            migrate_db(conn)
+            _schema_ready = True
+
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations."""
     conn = create_connection()
-    if conn is not None:
+    if conn is None:
+        raise SystemExit("Error: Cannot create database connection.")
+    try:
+        applied = migrate_db(conn)
+    finally:
+        conn.close()
+    if applied:
+        print(f"Applied migrations: {', '.join(map(str, applied))}")
+    print(f"Database schema is at version {SCHEMA_VERSION}.")
+
+
+# Bulk import: table -> (required columns, optional columns) accepted by `flask import`
+IMPORT_COLUMNS = {
+    'artifacts': (
+        ('item_name', 'category', 'origin', 'historical_period', 'location', 'image_filename'),
+        ('description', 'category_desc'),
+    ),
+    'exhibitions': (
+        ('exhibit_name', 'location', 'category', 'image_filename', 'start_date', 'end_date',
+         'opening_time', 'closing_time'),
+        ('description',),
+    ),
+    'exhibition_objects': (
+        ('title', 'creator', 'date', 'credit', 'image_filename'),
+        ('culture', 'medium', 'dimensions', 'description', 'exhibition_id'),
+    ),
+}
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_REPORTED = 20  # bad rows printed individually; the rest are only counted
+
+
+def read_import_rows(path, fmt):
+    """Yield (line number, record or None, parse error) for each record of a CSV or JSONL file."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_num, None, f"invalid JSON: {e}"
+                continue
+            if isinstance(record, dict):
+                yield line_num, record, None
+            else:
+                yield line_num, None, "expected a JSON object"
+
+
+def static_image_files():
+    """Return the set of paths (relative to static/, '/'-separated) of every file under static/images."""
+    root = os.path.join(app.static_folder, 'images')
+    files = set()
+    for folder, _, names in os.walk(root):
+        rel = os.path.relpath(folder, app.static_folder).replace(os.sep, '/')
+        files.update(f"{rel}/{name}" for name in names)
+    return files
+
+
+def import_image_candidates(table, values, exhibition_folders):
+    """Return the static paths where the pages would look for a row's image.
+
+    An exhibition object not yet linked to an exhibition may use an image from
+    any exhibition's folder, so every one of them is a candidate.
+    """
+    filename = values['image_filename']
+    if table == 'artifacts':
+        folders = [f"images/artifacts/{CATEGORY_SLUGS[values['category']]}"]
+    elif table == 'exhibitions':
+        folders = ['images/events' if values['category'] == 'Events' else 'images/exhibition']
+    elif values['exhibition_id'] is not None:
+        folders = [f"images/exhibition/{exhibition_folders[values['exhibition_id']]}"]
+    else:
+        folders = [f"images/exhibition/{folder}" for folder in sorted(set(exhibition_folders.values()))]
+    # Galleries differ on whether the stored name carries the .jpg extension
+    return [f"{folder}/{filename}{ext}" for folder in folders for ext in ('', '.jpg')]
+
+
+def validate_import_row(table, record, exhibition_folders, exhibition_ids):
+    """Clean one imported record into {column: value}; raise ValueError with the reason if it is unusable.
+
+    exhibition_folders maps exhibition ids to their image folder and
+    exhibition_ids maps slugs to ids.
+    """
+    required, optional = IMPORT_COLUMNS[table]
+    values = {}
+    for column in required + optional:
+        value = record.get(column)
+        value = str(value).strip() if value is not None else ''
+        if column in required and not value:
+            raise ValueError(f"missing {column}")
+        values[column] = value or None
+
+    filename = values['image_filename']
+    if '..' in filename.split('/') or filename.startswith('/') or '\\' in filename:
+        raise ValueError(f"image_filename {filename!r} must be a plain relative name")
+
+    if table == 'artifacts' and values['category'] not in CATEGORY_SLUGS:
+        raise ValueError(f"unknown category {values['category']!r}")
+    if table == 'exhibitions':
+        if values['category'] not in ('Exhibition', 'Events'):
+            raise ValueError(f"category must be 'Exhibition' or 'Events', not {values['category']!r}")
         try:
-            cursor = conn.cursor()
+            start = datetime.strptime(values['start_date'], '%Y-%m-%d')
+            end = datetime.strptime(values['end_date'], '%Y-%m-%d')
+            datetime.strptime(values['opening_time'], '%H:%M')
+            datetime.strptime(values['closing_time'], '%H:%M')
+        except ValueError:
+            raise ValueError("dates must be YYYY-MM-DD and times HH:MM")
+        if end < start:
+            raise ValueError("end_date is before start_date")
+    if table == 'exhibition_objects':
+        # The exhibition is given by id in exhibition_id, or by slug in exhibition (as in the API)
+        slug = str(record.get('exhibition') or '').strip()
+        exhibition_id = values['exhibition_id']
+        if exhibition_id is not None and slug:
+            raise ValueError("give exhibition_id or exhibition, not both")
+        if exhibition_id is not None:
+            if not exhibition_id.isdigit() or int(exhibition_id) not in exhibition_folders:
+                raise ValueError(f"unknown exhibition id {exhibition_id!r}")
+            values['exhibition_id'] = int(exhibition_id)
+        elif slug:
+            if slug not in exhibition_ids:
+                raise ValueError(f"unknown exhibition {slug!r}")
+            values['exhibition_id'] = exhibition_ids[slug]
+    return values
+
+
+@app.cli.command('import')
+@click.argument('table', type=click.Choice(sorted(IMPORT_COLUMNS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension.')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Rows per transaction.')
+@click.option('--rejects', type=click.Path(dir_okay=False), help='Write rejected records, with the reason, to this JSONL file.')
+@click.option('--skip-image-check', is_flag=True, help='Do not require image_filename to exist under static/images.')
+@click.option('--dry-run', is_flag=True, help='Validate the file without writing anything.')
+def import_command(table, path, fmt, batch_size, rejects, skip_image_check, dry_run):
+    """Bulk-load CSV or JSONL records into artifacts, exhibitions or exhibition_objects.
+
+    Exhibition objects name their exhibition by id in an exhibition_id
+    column or by slug in an exhibition column.
+    """
+    fmt = fmt or ('jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv')
+    conn = create_connection()
+    if conn is None:
+        raise SystemExit("Error: Cannot create database connection.")
+    ensure_schema(conn)
+
+    columns = [column for group in IMPORT_COLUMNS[table] for column in group]
+    if table == 'exhibitions':
+        columns.append('slug')
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    # Lookups the validation needs, loaded once rather than per row
+    exhibition_folders, exhibition_ids = {}, {}
+    for row in conn.execute("SELECT id, slug, image_filename FROM exhibitions"):
+        exhibition_folders[row['id']] = row['image_filename']
+        if row['slug'] is not None:
+            exhibition_ids[row['slug']] = row['id']
+    taken_slugs = set(exhibition_ids)
+    images = None if skip_image_check else static_image_files()
+
+    rejects_file = open(rejects, 'w', encoding='utf-8') if rejects else None
+    counts = {'read': 0, 'imported': 0, 'rejected': 0}
+
+    def reject(line_num, record, reason):
+        counts['rejected'] += 1
+        if counts['rejected'] <= IMPORT_MAX_REPORTED:
+            print(f"{path}:{line_num}: {reason}")
+        if rejects_file is not None:
+            rejects_file.write(json.dumps({'line': line_num, 'error': reason, 'record': record}) + '\n')
+
+    def flush(batch):
+        if dry_run or not batch:
+            counts['imported'] += len(batch)
+            return
+        try:
+            conn.executemany(sql, [params for _, _, params in batch])
+            conn.commit()
+            counts['imported'] += len(batch)
+        except Error:
+            # Something slipped past validation; redo the batch row by row to find it
+            conn.rollback()
+            for line_num, record, params in batch:
+                try:
+                    conn.execute(sql, params)
+                    counts['imported'] += 1
+                except Error as e:
+                    reject(line_num, record, f"database error: {e}")
+            conn.commit()
 
-            # List of table creation SQL statements
-            tables = [
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    phone_number TEXT NOT NULL,
-                    email TEXT NOT NULL UNIQUE,
-                    password TEXT NOT NULL,
-                    address_line1 TEXT NOT NULL,
-                    address_line2 TEXT,
-                    city TEXT NOT NULL,
-                    zip_code TEXT NOT NULL
-                )
-                """,
-                """
-                CREATE TABLE IF NOT EXISTS admins (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    email TEXT NOT NULL UNIQUE,
-                    password TEXT NOT NULL
-                )
-                """,
-                """
-                CREATE TABLE IF NOT EXISTS exhibitions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    exhibit_name TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    image_filename TEXT NOT NULL,
-                    start_date TEXT NOT NULL,
-                    end_date TEXT NOT NULL,
-                    opening_time TEXT NOT NULL,
-                    closing_time TEXT NOT NULL,
-                    description TEXT
-                )
-                """,
-                """
-                CREATE TABLE IF NOT EXISTS artifacts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item_name TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    origin TEXT NOT NULL,
-                    historical_period TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    image_filename TEXT NOT NULL,
-                    description TEXT,
-                    category_desc TEXT
-                )
-                """,
-                """
-                CREATE TABLE IF NOT EXISTS exhibition_objects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    creator TEXT NOT NULL,
-                    culture TEXT,
-                    date TEXT NOT NULL,
-                    medium TEXT,
-                    dimensions TEXT,
-                    credit TEXT NOT NULL,
-                    description TEXT,
-                    image_filename TEXT NOT NULL
-                )
-                """
-            ]
+    started = time.perf_counter()
+    batch = []
+    try:
+        for line_num, record, error in read_import_rows(path, fmt):
+            counts['read'] += 1
+            try:
+                if error:
+                    raise ValueError(error)
+                values = validate_import_row(table, record, exhibition_folders, exhibition_ids)
+                if images is not None:
+                    candidates = import_image_candidates(table, values, exhibition_folders)
+                    if not images.intersection(candidates):
+                        where = candidates[0] if len(candidates) <= 2 else (
+                            f"{values['image_filename']} in any exhibition folder")
+                        raise ValueError(f"image {where} not found under static/")
+            except ValueError as e:
+                reject(line_num, record, str(e))
+                continue
+
+            if table == 'exhibitions':
+                base = slugify(values['exhibit_name'])
+                slug, n = base, 2
+                while slug in taken_slugs:
+                    slug, n = f"{base}_{n}", n + 1
+                taken_slugs.add(slug)
+                values['slug'] = slug
+            batch.append((line_num, record, [values[column] for column in columns]))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        flush(batch)
+    finally:
+        conn.close()
+        if rejects_file is not None:
+            rejects_file.close()
+
+    elapsed = time.perf_counter() - started
+    if counts['rejected'] > IMPORT_MAX_REPORTED:
+        print(f"... {counts['rejected'] - IMPORT_MAX_REPORTED} more rejected rows not shown.")
+    verb = 'Validated' if dry_run else 'Imported'
+    print(f"{verb} {counts['imported']} of {counts['read']} {table} records in {elapsed:.2f}s "
+          f"({counts['read'] / elapsed if elapsed else 0:,.0f} records/s); {counts['rejected']} rejected.")
+
+
+# Catalogue export: `flask export` and /export/<table>.<csv|jsonl> stream a table
+# in id order, one short keyset query per batch, so neither memory nor the read
+# snapshot grows with the table and admin edits are never held up behind a dump.
+EXPORT_COLUMNS = {
+    table: ('id',) + required + optional + (('slug',) if table == 'exhibitions' else ())
+    for table, (required, optional) in IMPORT_COLUMNS.items()
+}
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+EXPORT_BATCH_SIZE = 1000     # rows per keyset query
+EXPORT_BUFFER_SIZE = 65536   # bytes of output gathered before a chunk is handed on
+
+
+def export_chunks(table, fmt, compress=False):
+    """Yield a table as CSV or JSONL in byte chunks, gzipped when compress is set.
+
+    Uses a connection of its own, so it can outlive the request that started it.
+    The output of a CSV export is accepted back by `flask import`.
+    """
+    conn = create_connection()
+    if conn is None:
+        return
+    ensure_schema(conn)
+    columns = EXPORT_COLUMNS[table]
+    sql = f"SELECT {', '.join(columns)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    gz = zlib.compressobj(9, zlib.DEFLATED, 31) if compress else None  # wbits 31: gzip container
+
+    def drain():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return gz.compress(data) if gz is not None else data
 
-            # Execute all table creation statements
-            for table_sql in tables:
-                cursor.execute(table_sql)
-            
+    try:
+        if writer is not None:
+            writer.writerow(columns)
+        last_id = 0
+        while True:
+            # Each batch is its own statement: no read transaction spans the export
+            rows = conn.execute(sql, (last_id, EXPORT_BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(dict(row), ensure_ascii=False) + '\n')
+            last_id = rows[-1]['id']
+            if buffer.tell() >= EXPORT_BUFFER_SIZE:
+                chunk = drain()
+                if chunk:
+                    yield chunk
+        chunk = drain() + (gz.flush() if gz is not None else b'')
+        if chunk:
+            yield chunk
+    finally:
+        conn.close()
+
+
+@app.cli.command('export')
+@click.argument('table', type=click.Choice(sorted(EXPORT_COLUMNS)))
+@click.argument('output', default='-', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_MIMETYPES)), help='Defaults to the file extension, else csv.')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output (implied by a .gz file name).')
+def export_command(table, output, fmt, compress):
+    """Stream artifacts, exhibitions or exhibition_objects to a CSV/JSONL file, or stdout by default."""
+    compress = compress or output.endswith('.gz')
+    if fmt is None:
+        fmt = 'jsonl' if output.removesuffix('.gz').endswith(('.jsonl', '.ndjson')) else 'csv'
+    started = time.perf_counter()
+    written = 0
+    with click.open_file(output, 'wb') as f:
+        for chunk in export_chunks(table, fmt, compress):
+            f.write(chunk)
+            written += len(chunk)
+    if output != '-':
+        print(f"Exported {table} to {output} ({written} bytes) in {time.perf_counter() - started:.2f}s.")
+
+
+@app.route('/export/<table>.<fmt>')
+def export_table(table, fmt):
+    """Download a full table for partners; ?gzip=1 sends a .gz file."""
+    if 'admin_email' not in session:
+        return redirect(url_for('adminLogin'))
+    if table not in EXPORT_COLUMNS or fmt not in EXPORT_MIMETYPES:
+        abort(404)
+
+    compress = request.args.get('gzip') == '1'
+    filename = f"{table}-{datetime.now():%Y-%m-%d}.{fmt}"
+    response = app.response_class(export_chunks(table, fmt, compress), mimetype=EXPORT_MIMETYPES[fmt])
+    if compress:
+        # A gzip file rather than a Content-Encoding, so clients keep it compressed on disk
+        filename += '.gz'
+        response.mimetype = 'application/gzip'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.cache_control.no_store = True
+    return response
+
+
+# Synthetic catalogue: `flask generate` writes a new database of any size for
+# scale testing. Everything is drawn from one seeded random.Random, so a seed
+# and the row counts always give the same catalogue (password salts aside).
+# Image names, origins, creators and the like are borrowed from the
+# hand-seeded catalogue so generated rows render with real images, and the
+# description text is cut from its descriptions.
+GENERATE_PASSWORD = 'Museum#2024'  # shared by every generated user and admin
+GENERATE_BATCH_SIZE = 10000
+_GENERATE_WORDS = {
+    'adjective': ('Carved', 'Gilded', 'Painted', 'Inlaid', 'Glazed', 'Bronze', 'Lacquered', 'Woven',
+                  'Ceremonial', 'Miniature', 'Engraved', 'Ivory', 'Jade', 'Silver', 'Terracotta', 'Enamelled'),
+    'noun': ('bowl', 'figure', 'vessel', 'mask', 'panel', 'helmet', 'jar', 'pendant', 'screen', 'box',
+             'dagger', 'textile', 'plaque', 'ewer', 'scroll', 'tile', 'amulet', 'seal', 'mirror', 'lamp'),
+    'theme': ('Echoes', 'Visions', 'Treasures', 'Voices', 'Threads', 'Crossroads', 'Mirrors', 'Horizons',
+              'Fragments', 'Legacies', 'Rituals', 'Journeys'),
+    'subject': ('the Silk Road', 'Ancient Courts', 'the Northern Seas', 'the Desert Kingdoms', 'Island Worlds',
+                'the Mountain Temples', 'Imperial Workshops', 'the River Valleys', 'Forgotten Cities'),
+    'event': ('Gallery Talk', 'Family Workshop', 'Late Opening', 'Film Night', 'Curator Tour', 'Lecture',
+              'Concert', 'Drawing Class', 'Members Evening', 'Craft Fair'),
+    'first_name': ('Ava', 'Liam', 'Maya', 'Noah', 'Zara', 'Omar', 'Lena', 'Ravi', 'Iris', 'Jonas',
+                   'Sofia', 'Kenji', 'Amara', 'Felix', 'Nadia', 'Theo'),
+    'last_name': ('Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Kim', 'Haddad', 'Larsen', 'Patel',
+                  'Rossi', 'Murphy', 'Tanaka', 'Mensah', 'Weber'),
+    'city': ('Springfield', 'Riverton', 'Lakeside', 'Fairview', 'Hillcrest', 'Oakridge'),
+}
+
+
+def _catalogue_pools():
+    """Value pools and description text taken from the hand-seeded database."""
+    pools = {'artifacts': {}, 'Exhibition': [], 'Events': [], 'pages': {}, 'object_images': {}, 'objects': [],
+             'text': ''}
+    if not os.path.exists(DATABASE):
+        raise click.ClickException(f"The seed catalogue {DATABASE} does not exist; "
+                                   "point DATABASE_PATH at an existing museum database.")
+    # Read from an in-memory copy brought up to the current schema, leaving the real file untouched
+    source = sqlite3.connect(f"file:{DATABASE}?mode=ro", uri=True)
+    conn = sqlite3.connect(':memory:')
+    try:
+        source.backup(conn)
+        source.close()
+        migrate_db(conn)
+        for row in conn.execute("SELECT category, origin, historical_period, location, image_filename, category_desc "
+                                "FROM artifacts ORDER BY id"):
+            if row[0] in CATEGORY_SLUGS:
+                pools['artifacts'].setdefault(row[0], []).append(row[1:])
+        for category, location, image in conn.execute(
+                "SELECT category, location, image_filename FROM exhibitions ORDER BY id"):
+            pools['Events' if category == 'Events' else 'Exhibition'].append((location, image))
+        for row in conn.execute(
+                "SELECT slug, location, start_date, end_date, opening_time, closing_time, description "
+                f"FROM exhibitions WHERE slug IN ({', '.join('?' * len(EXHIBITION_PAGES))})", tuple(EXHIBITION_PAGES)):
+            pools['pages'][row[0]] = row[1:]
+        for folder, image in conn.execute(
+                "SELECT e.image_filename, o.image_filename FROM exhibition_objects o "
+                "JOIN exhibitions e ON e.id = o.exhibition_id ORDER BY o.id"):
+            pools['object_images'].setdefault(folder, []).append(image)
+        pools['objects'] = conn.execute(
+            "SELECT creator, culture, date, medium, dimensions, credit FROM exhibition_objects ORDER BY id").fetchall()
+        pools['text'] = ' '.join(row[0] for row in conn.execute(
+            "SELECT description FROM artifacts WHERE description != '' "
+            "UNION ALL SELECT description FROM exhibition_objects WHERE description != '' ORDER BY 1"))
+    except Error as e:
+        print(f"Error reading the seed catalogue, falling back to placeholders: {e}")
+    finally:
+        conn.close()
+
+    placeholder = ('Unknown', 'Undated', 'Gallery 1', 'placeholder', None)
+    for category in ARTIFACT_CATEGORIES.values():
+        pools['artifacts'].setdefault(category, [placeholder])
+    pools['Exhibition'] = pools['Exhibition'] or [('Main Hall', 'exhibition_hero')]
+    pools['Events'] = pools['Events'] or [('Main Hall', 'events_hero.jpg')]
+    pools['objects'] = pools['objects'] or [('Unknown', None, 'Undated', None, None, 'Museum purchase')]
+    text = pools['text'] or 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. '
+    while len(text) < 20000:
+        text += ' ' + text
+    pools['text'] = text + ' ' + text[:2000]  # room to read 2000 characters from any offset
+    return pools
+
+
+def _description(rng, text):
+    """A run of catalogue prose: median ~200 characters like the hand-written ones, 2% of 1500-2000."""
+    if rng.random() < 0.02:
+        length = 1500 + int(rng.random() * 500)
+    else:
+        length = min(2000, max(40, int(rng.lognormvariate(5.3, 0.6))))
+    start = text.find(' ', int(rng.random() * (len(text) - 2001))) + 1
+    return text[start:start + length].strip()
+
+
+def generate_catalogue(path, seed=0, users=1000, admins=5, exhibitions=100, events=50, artifacts=10000, objects=10000):
+    """Write a new synthetic catalogue database at path; return {table: rows written}.
+
+    The hand-built EXHIBITION_PAGES exhibitions are always written first, with
+    their slugs, on top of the requested number of generated ones. Triggers and secondary indexes are dropped for the bulk load and the
+    derived data (stats, search index, data versions) rebuilt in one pass
+    afterwards, which is far faster than firing the triggers per row.
+    """
+    rng = random.Random(seed)
+    pools = _catalogue_pools()
+    # Cheaper than rng.choice() across millions of draws, and just as repeatable
+    choose = lambda seq: seq[int(rng.random() * len(seq))]
+    pick = lambda name: choose(_GENERATE_WORDS[name])
+    password = hash_password(GENERATE_PASSWORD)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        migrate_db(conn)
+        tables = ('users', 'admins', 'exhibitions', 'artifacts', 'exhibition_objects')
+        deferred = conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join('?' * len(tables))})", tables).fetchall()
+        for kind, name, _ in deferred:
+            conn.execute(f"DROP {kind.upper()} {name}")
+
+        def insert(table, columns, rows):
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            rows = iter(rows)
+            while batch := list(itertools.islice(rows, GENERATE_BATCH_SIZE)):
+                conn.executemany(sql, batch)
             conn.commit()
-            print("Database tables created successfully.")
-        except Error as e:
-            print(f"Error initializing database: {e}")
-            conn.rollback()  # Rollback in case of error
-        finally:
-            conn.close()
+
+        def people(count, prefix):
+            for n in range(1, count + 1):
+                yield (pick('first_name'), pick('last_name'), f"{prefix}{n}@example.com", password)
+
+        insert('users', ('first_name', 'last_name', 'email', 'password', 'phone_number', 'address_line1',
+                         'address_line2', 'city', 'zip_code'),
+               (person + (f"555-{rng.randrange(10000):04d}", f"{rng.randrange(1, 999)} Museum Road", None,
+                          pick('city'), f"{rng.randrange(100000):05d}") for person in people(users, 'user')))
+        insert('admins', ('first_name', 'last_name', 'email', 'password'), people(admins, 'admin'))
+
+        def shows():
+            # The hand-built pages, as seeded where the live catalogue has them
+            for slug, name in EXHIBITION_PAGES.items():
+                location, image = choose(pools['Exhibition'])
+                details = pools['pages'].get(slug) or (location, '2023-01-01', '2023-12-31', '10:00', '17:30',
+                                                       _description(rng, pools['text']))
+                yield (name, details[0], 'Exhibition', slug) + details[1:] + (slug,)
+            day = datetime(2023, 1, 1).toordinal()
+            for n in range(1, exhibitions + events + 1):
+                is_event = n > exhibitions
+                location, image = choose(pools['Events' if is_event else 'Exhibition'])
+                start = day + rng.randrange(5 * 365)
+                if is_event:
+                    name = f"{pick('event')}: {pick('theme')} of {pick('subject')}"
+                    end = start + (0 if rng.random() < 0.7 else rng.randrange(1, 4))
+                    opening = rng.choice(('10:00', '11:00', '14:00', '18:00', '19:00'))
+                    closing = f"{int(opening[:2]) + rng.choice((1, 2, 3)):02d}:{rng.choice(('00', '30'))}"
+                else:
+                    name = f"{pick('theme')} of {pick('subject')}"
+                    end = start + rng.randrange(30, 366)
+                    opening, closing = rng.choice((('09:00', '17:00'), ('10:00', '17:30'), ('10:00', '18:00')))
+                yield (name, location, 'Events' if is_event else 'Exhibition', image,
+                       datetime.fromordinal(start).strftime('%Y-%m-%d'), datetime.fromordinal(end).strftime('%Y-%m-%d'),
+                       opening, closing, _description(rng, pools['text']), f"{slugify(name)}_{n}")
+
+        insert('exhibitions', ('exhibit_name', 'location', 'category', 'image_filename', 'start_date', 'end_date',
+                               'opening_time', 'closing_time', 'description', 'slug'), shows())
+
+        categories = list(ARTIFACT_CATEGORIES.values())
+
+        def artifact_rows():
+            for _ in range(artifacts):
+                category = choose(categories)
+                origin, period, location, image, category_desc = choose(pools['artifacts'][category])
+                yield (f"{pick('adjective')} {pick('noun')}", category, origin, period, location, image,
+                       _description(rng, pools['text']), category_desc)
+
+        insert('artifacts', ('item_name', 'category', 'origin', 'historical_period', 'location', 'image_filename',
+                             'description', 'category_desc'), artifact_rows())
+
+        galleries = conn.execute(
+            "SELECT id, image_filename FROM exhibitions WHERE category = 'Exhibition' ORDER BY id").fetchall()
+        every_image = [image for images in pools['object_images'].values() for image in images] or ['placeholder']
+
+        def object_rows():
+            for n in range(objects):
+                # Deal the first objects out one per gallery so every exhibition has some
+                if n < len(galleries):
+                    exhibition_id, folder = galleries[n]
+                else:
+                    exhibition_id, folder = choose(galleries) if galleries else (None, None)
+                creator, culture, date, medium, dimensions, credit = choose(pools['objects'])
+                image = choose(pools['object_images'].get(folder) or every_image)
+                yield (f"{pick('adjective')} {pick('noun')}", creator, culture, date, medium, dimensions, credit,
+                       _description(rng, pools['text']), image, exhibition_id)
+
+        insert('exhibition_objects', ('title', 'creator', 'culture', 'date', 'medium', 'dimensions', 'credit',
+                                      'description', 'image_filename', 'exhibition_id'), object_rows())
+
+        # Rebuild what the triggers would have maintained, then put them back
+        for kind, _, sql in deferred:
+            if kind == 'index':
+                conn.execute(sql)
+        conn.execute(STATS_REFRESH)
+        # Fill the search index without incremental merging, then merge it once
+        conn.execute("INSERT INTO search_index (search_index, rank) VALUES ('automerge', 0)")
+        for sql in search_index_statements():
+            if 'CREATE TRIGGER' not in sql:
+                conn.execute(sql)
+        conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        conn.execute("INSERT INTO search_index (search_index, rank) VALUES ('automerge', 4)")
+        conn.execute("UPDATE data_versions SET version = version + 1, updated_at = strftime('%s', 'now')")
+        for kind, _, sql in deferred:
+            if kind == 'trigger':
+                conn.execute(sql)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA optimize")
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+
+@app.cli.command('generate')
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('--seed', default=0, show_default=True)
+@click.option('--users', default=1000, show_default=True)
+@click.option('--admins', default=5, show_default=True)
+@click.option('--exhibitions', default=100, show_default=True)
+@click.option('--events', default=50, show_default=True)
+@click.option('--artifacts', default=100000, show_default=True)
+@click.option('--objects', default=100000, show_default=True)
+@click.option('--force', is_flag=True, help='Replace OUTPUT if it exists.')
+def generate_command(output, seed, users, admins, exhibitions, events, artifacts, objects, force):
+    """Write a deterministic synthetic catalogue to a new database file OUTPUT."""
+    if os.path.exists(output):
+        if not force:
+            raise click.ClickException(f"{output} exists; pass --force to replace it.")
+        for leftover in (output, output + '-wal', output + '-shm'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    started = time.perf_counter()
+    counts = generate_catalogue(output, seed, users, admins, exhibitions, events, artifacts, objects)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(', '.join(f"{count} {table}" for table, count in counts.items()))
+    print(f"Generated {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s). "
+          f"Every account's password is {GENERATE_PASSWORD!r}.")
+    print(f"Serve it with: DATABASE_PATH={output} flask run")
+
+
+# Benchmarks: `flask benchmark` generates a catalogue (seed 0) at each size, then
+# drives every GET route through the test client (in a forked process) and
+# through a local multi-worker gunicorn. Results land in instance/benchmarks/
+# as JSON named after the commit, so runs can be compared with --compare.
+BENCHMARK_DIR = os.path.join(INSTANCE_FOLDER, 'benchmarks')
+BENCHMARK_SKIP = {'logout', 'adminLogout'}  # would end the session mid-run
+BENCHMARK_QUERY = {'search': 'q=bronze', 'suggest_view': 'q=bro'}
+BENCHMARK_PERCENTILES = (50, 95, 99)
+
+
+def benchmark_urls(path):
+    """Return {endpoint: url} for every GET route, with sample arguments taken from the database at path."""
+    conn = sqlite3.connect(path)
+    try:
+        first = lambda sql: (conn.execute(sql).fetchone() or (None,))[0]
+        samples = {
+            'category_slug': next(iter(ARTIFACT_CATEGORIES)),
+            'slug': first("SELECT slug FROM exhibitions WHERE id IN (SELECT exhibition_id FROM exhibition_objects) ORDER BY id"),
+            'exhibit_id': first("SELECT MIN(id) FROM exhibitions"),
+            'object_id': first("SELECT MIN(id) FROM exhibition_objects"),
+            'artifact_id': first("SELECT MIN(id) FROM artifacts"),
+            'item_id': first("SELECT MIN(id) FROM artifacts"),
+            'resource': 'artifacts',
+            'table': 'artifacts',
+            'fmt': 'csv',
+            'name': 'site.css',
+            'filename': 'styles.css',
+        }
+    finally:
+        conn.close()
+
+    urls = {}
+    with app.test_request_context():
+        for rule in app.url_map.iter_rules():
+            if 'GET' not in rule.methods or rule.endpoint in BENCHMARK_SKIP:
+                continue
+            values = {arg: samples[arg] for arg in rule.arguments if arg not in (rule.defaults or {})}
+            url = url_for(rule.endpoint, **values)
+            query = BENCHMARK_QUERY.get(rule.endpoint)
+            urls[rule.endpoint] = f"{url}?{query}" if query else url
+    return urls
+
+
+def summarize_latencies(latencies, elapsed):
+    """Throughput and latency percentiles (ms) for one route."""
+    latencies = sorted(latencies)
+    result = {'requests': len(latencies), 'throughput': round(len(latencies) / elapsed, 1) if elapsed else 0}
+    for p in BENCHMARK_PERCENTILES:
+        value = latencies[min(len(latencies) - 1, round(p / 100 * (len(latencies) - 1)))] if latencies else 0
+        result[f"p{p}_ms"] = round(value * 1000, 2)
+    return result
+
+
+def _client_benchmark(path, urls, max_requests, duration, results):
+    """Forked child: run every route through the test client against the database at path."""
+    global DATABASE
+    DATABASE = path
+    log.setLevel(logging.ERROR)
+    client = app.test_client()
+    admin = app.test_client()
+    with admin.session_transaction() as sess:
+        sess['admin_email'] = 'benchmark@example.com'
+
+    routes = {}
+    for endpoint, url in urls.items():
+        # Admin routes bounce anonymous visitors to the login page
+        response = client.get(url)
+        response.get_data()
+        response.close()
+        use = admin if response.status_code == 302 and '/adminLogin' in response.location else client
+        before = list(_metrics.get(endpoint, ()))
+        latencies, failed = [], 0
+        started = time.perf_counter()
+        while len(latencies) < max_requests and time.perf_counter() - started < duration:
+            t = time.perf_counter()
+            response = use.get(url, headers={'Accept-Encoding': 'gzip'})
+            response.get_data()
+            response.close()
+            latencies.append(time.perf_counter() - t)
+            failed += response.status_code != 200
+        result = summarize_latencies(latencies, time.perf_counter() - started)
+        after = _metrics.get(endpoint)
+        if after is not None:
+            handled = sum(after[:_N_BUCKETS]) - sum(before[:_N_BUCKETS])
+            statements = after[_N_BUCKETS + 2] - (before[_N_BUCKETS + 2] if before else 0)
+            result['queries_per_request'] = round(statements / handled, 2) if handled else None
+        result.update(url=url, status=response.status_code, failed=failed)
+        routes[endpoint] = result
+    results.send({'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'routes': routes})
+    results.close()
+
+
+def _gunicorn_peak_rss(master_pid):
+    """Peak RSS (KiB) of each gunicorn worker, read from /proc; [] where that is unavailable."""
+    peaks = []
+    for pid in os.listdir('/proc') if os.path.isdir('/proc') else ():
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                status = dict(line.split(':', 1) for line in f if ':' in line)
+        except (OSError, ValueError):
+            continue
+        if status.get('PPid', '').strip() == str(master_pid) and 'VmHWM' in status:
+            peaks.append(int(status['VmHWM'].split()[0]))
+    return peaks
+
+
+def _gunicorn_benchmark(path, urls, workers, concurrency, max_requests, duration):
+    """Serve the database at path from gunicorn and load every route with concurrent keep-alive clients."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, DATABASE_PATH=path, LOG_LEVEL='ERROR', ACCESS_LOG='0')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f"127.0.0.1:{port}",
+         '--log-level', 'warning', 'app:app'],
+        cwd=app.root_path, env=env)
+    cookie = app.session_interface.get_signing_serializer(app).dumps({'admin_email': 'benchmark@example.com'})
+    headers = {'Accept-Encoding': 'gzip', 'Cookie': f"{app.config['SESSION_COOKIE_NAME']}={cookie}"}
+
+    def request_once(conn, url):
+        conn.request('GET', url, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                request_once(http.client.HTTPConnection('127.0.0.1', port, timeout=5), '/about')
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise click.ClickException("gunicorn did not start (is it installed?)")
+                time.sleep(0.2)
+
+        def worker(url, stop_at, budget):
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            latencies, status, failed = [], None, 0
+            try:
+                while len(latencies) < budget and time.perf_counter() < stop_at:
+                    t = time.perf_counter()
+                    status = request_once(conn, url)
+                    latencies.append(time.perf_counter() - t)
+                    failed += status != 200
+            finally:
+                conn.close()
+            return latencies, status, failed
+
+        routes = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for endpoint, url in urls.items():
+                started = time.perf_counter()
+                budget = -(-max_requests // concurrency)
+                futures = [pool.submit(worker, url, started + duration, budget) for _ in range(concurrency)]
+                latencies, status, failed = [], None, 0
+                for future in futures:
+                    part, status, part_failed = future.result()
+                    latencies += part
+                    failed += part_failed
+                routes[endpoint] = dict(summarize_latencies(latencies, time.perf_counter() - started),
+                                        url=url, status=status, failed=failed)
+        peaks = _gunicorn_peak_rss(server.pid)
+        return {'workers': workers, 'concurrency': concurrency,
+                'peak_rss_kb': max(peaks, default=None), 'total_peak_rss_kb': sum(peaks) or None,
+                'routes': routes}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare_benchmarks(old, new):
+    """Print p95 and throughput changes between two result files, route by route."""
+    for size, modes in new['sizes'].items():
+        for mode in ('client', 'gunicorn'):
+            before = old.get('sizes', {}).get(size, {}).get(mode, {}).get('routes', {})
+            for endpoint, result in modes.get(mode, {}).get('routes', {}).items():
+                was = before.get(endpoint)
+                if not was or was.get('failed') or result['failed']:
+                    continue
+                change = lambda key: (f"{(result[key] - was[key]) / was[key] * 100:+.0f}%" if was[key] else 'n/a')
+                print(f"{size:>8} {mode:<8} {endpoint:<32} p95 {was['p95_ms']:>8} -> {result['p95_ms']:>8} ms "
+                      f"({change('p95_ms')}), {was['throughput']:>8} -> {result['throughput']:>8} req/s ({change('throughput')})")
+
+
+@app.cli.command('benchmark')
+@click.option('--sizes', default='1000,100000,1000000', show_default=True, help='Comma-separated artifact/object counts.')
+@click.option('--requests', 'max_requests', default=500, show_default=True, help='Maximum requests per route.')
+@click.option('--duration', default=2.0, show_default=True, help='Maximum seconds per route.')
+@click.option('--workers', default=4, show_default=True, help='gunicorn worker processes.')
+@click.option('--concurrency', default=8, show_default=True, help='Concurrent clients against gunicorn.')
+@click.option('--gunicorn/--no-gunicorn', 'with_gunicorn', default=True, help='Also benchmark through gunicorn.')
+@click.option('--route', 'only', multiple=True, help='Only these endpoints (repeatable).')
+@click.option('--reseed', is_flag=True, help='Rebuild the seeded databases even if they exist.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Result file (default: instance/benchmarks/<commit>-<time>.json).')
+@click.option('--compare', type=click.File(), help='An earlier result file to compare against.')
+def benchmark_command(sizes, max_requests, duration, workers, concurrency, with_gunicorn, only, reseed, output, compare):
+    """Measure throughput, latency percentiles, queries per request and peak RSS for every GET route."""
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=app.root_path,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    results = {
+        'commit': commit,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'settings': {'requests': max_requests, 'duration': duration, 'workers': workers, 'concurrency': concurrency},
+        'sizes': {},
+    }
+    failures = []
+
+    for size in (int(size) for size in sizes.split(',')):
+        path = os.path.join(BENCHMARK_DIR, f"museum-{size}.db")
+        entry = results['sizes'][str(size)] = {}
+        if reseed or not os.path.exists(path):
+            for leftover in (path, path + '-wal', path + '-shm'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            started = time.perf_counter()
+            generate_catalogue(path, seed=0, artifacts=size, objects=size)
+            entry['seed_seconds'] = round(time.perf_counter() - started, 2)
+            print(f"Seeded {size} rows per table in {entry['seed_seconds']}s.")
+        urls = benchmark_urls(path)
+        if only:
+            urls = {endpoint: url for endpoint, url in urls.items() if endpoint in only}
+
+        receiver, sender = multiprocessing.get_context('fork').Pipe(duplex=False)
+        # Run in an empty context: requests would otherwise share the CLI's app context (and its g)
+        child = multiprocessing.get_context('fork').Process(
+            target=contextvars.Context().run, args=(_client_benchmark, path, urls, max_requests, duration, sender))
+        child.start()
+        sender.close()
+        entry['client'] = receiver.recv()
+        child.join()
+        if with_gunicorn:
+            entry['gunicorn'] = _gunicorn_benchmark(path, urls, workers, concurrency, max_requests, duration)
+
+        for endpoint in urls:
+            line = f"{size:>8} {endpoint:<32}"
+            for mode in ('client', 'gunicorn'):
+                result = entry.get(mode, {}).get('routes', {}).get(endpoint)
+                if not result:
+                    continue
+                if result['failed']:
+                    # Timings of error pages say nothing about the route
+                    line += f" {mode} FAILED: {result['failed']}/{result['requests']} not 200 (last {result['status']})"
+                    failures.append(f"{size} {mode} {endpoint}")
+                else:
+                    line += (f" {mode} {result['throughput']:>8} req/s p50 {result['p50_ms']:>7} "
+                             f"p95 {result['p95_ms']:>7} p99 {result['p99_ms']:>7} ms")
+            queries = entry['client']['routes'][endpoint].get('queries_per_request')
+            print(f"{line} {queries if queries is not None else '-'} queries/request")
+
+    output = output or os.path.join(BENCHMARK_DIR, f"{commit}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=1)
+    print(f"Results written to {output}.")
+    if compare is not None:
+        compare_benchmarks(json.load(compare), results)
+    if failures:
+        raise click.ClickException(f"{len(failures)} route(s) answered something other than 200: "
+                                   + ', '.join(failures))
+
+
+# Responsive images: `flask build-images` writes resized WebP and fallback
+# copies of everything under static/images into static/images/_derived and
+# records them in static/images/manifest.json for the responsive_image() helper.
+IMAGE_WIDTHS = (320, 640, 960, 1280, 1920)
+IMAGE_QUALITY = {'WEBP': 78, 'JPEG': 80}
+IMAGE_SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+IMAGE_DERIVED_DIR = 'images/_derived'
+IMAGE_MANIFEST = os.path.join(app.static_folder, 'images', 'manifest.json')
+DEFAULT_IMAGE_SIZES = '(min-width: 768px) 33vw, (min-width: 576px) 50vw, 100vw'
+
+_image_manifest = None
+
+
+def _build_image_derivatives(rel_path, force=False):
+    """Resize one static image to IMAGE_WIDTHS in WebP plus a JPEG/PNG fallback; return its manifest entry."""
+    from PIL import Image, ImageOps
+
+    source = os.path.join(app.static_folder, rel_path)
+    stem = os.path.splitext(os.path.relpath(rel_path, 'images'))[0]
+    source_mtime = os.stat(source).st_mtime
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        width, height = image.size
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        fallback = 'PNG' if has_alpha else 'JPEG'
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        # Never upscale; an image narrower than every width gets one copy at its own size
+        widths = [w for w in IMAGE_WIDTHS if w < width] or [width]
+        entry = {'width': width, 'height': height, 'webp': [], 'fallback': []}
+        for w in widths:
+            resized = None
+            for fmt, key in (('WEBP', 'webp'), (fallback, 'fallback')):
+                out = f"{IMAGE_DERIVED_DIR}/{stem}-{w}.{'jpg' if fmt == 'JPEG' else fmt.lower()}"
+                out_path = os.path.join(app.static_folder, out)
+                if force or not os.path.exists(out_path) or os.stat(out_path).st_mtime < source_mtime:
+                    if resized is None:
+                        resized = image if w == width else image.resize((w, round(height * w / width)), Image.LANCZOS)
+                    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                    options = {'optimize': True}
+                    if fmt in IMAGE_QUALITY:
+                        options['quality'] = IMAGE_QUALITY[fmt]
+                    if fmt == 'JPEG':
+                        options['progressive'] = True
+                    if fmt == 'WEBP':
+                        options['method'] = 6
+                    resized.save(out_path, fmt, **options)
+                entry[key].append([w, out])
+    return entry
+
+
+@app.cli.command('build-images')
+@click.option('--force', is_flag=True, help='Rebuild derivatives even if they are up to date.')
+def build_images_command(force):
+    """Generate resized WebP/fallback images and static/images/manifest.json."""
+    images_root = os.path.join(app.static_folder, 'images')
+    derived_root = os.path.join(app.static_folder, IMAGE_DERIVED_DIR)
+    sources = []
+    for folder, dirs, files in os.walk(images_root):
+        if os.path.abspath(folder).startswith(os.path.abspath(derived_root)):
+            continue
+        for name in files:
+            if name.lower().endswith(IMAGE_SOURCE_EXTENSIONS):
+                sources.append(os.path.relpath(os.path.join(folder, name), app.static_folder).replace(os.sep, '/'))
+
+    manifest = {}
+    failed = 0
+    # Pillow releases the GIL while resizing and encoding, so threads scale here
+    with ThreadPoolExecutor() as executor:
+        futures = {executor.submit(_build_image_derivatives, path, force): path for path in sorted(sources)}
+        for future in futures:
+            try:
+                manifest[futures[future]] = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Error processing {futures[future]}: {e}")
+
+    with open(IMAGE_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    def total_size(paths):
+        return sum(os.path.getsize(os.path.join(app.static_folder, p)) for p in paths)
+    before = total_size(manifest)
+    smallest = total_size(entry['webp'][0][1] for entry in manifest.values())
+    print(f"Processed {len(manifest)} images ({failed} failed): originals {before / 1e6:.1f} MB, "
+          f"smallest WebP set {smallest / 1e6:.1f} MB.")
+
+
+def get_image_manifest():
+    """Return the derivative manifest, loading it on first use ({} until `flask build-images` has run)."""
+    global _image_manifest
+    if _image_manifest is None:
+        try:
+            with open(IMAGE_MANIFEST) as f:
+                _image_manifest = json.load(f)
+        except (OSError, ValueError):
+            _image_manifest = {}
+    return _image_manifest
+
+
+@app.template_global()
+def responsive_image(path, alt='', sizes=DEFAULT_IMAGE_SIZES, **attrs):
+    """Render a lazily loaded <img> for a static image, with WebP/fallback srcsets when derivatives exist.
+
+    path is relative to the static folder, e.g. 'images/artifacts/asian_art/vase.jpg'.
+    Extra keyword arguments (class, style, ...) become attributes of the <img>.
+    """
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    src = url_for('static', filename=path)
+    entry = get_image_manifest().get(path)
+    if entry is None:
+        extra = ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items())
+        return Markup(f'<img src="{escape(src)}" alt="{escape(alt)}"{extra}>')
+
+    def srcset(candidates):
+        return ', '.join(f"{url_for('static', filename=p)} {w}w" for w, p in candidates)
+
+    attrs.setdefault('width', entry['width'])
+    attrs.setdefault('height', entry['height'])
+    extra = ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items())
+    # display: contents keeps <picture> out of the layout so existing <img> styling still applies
+    return Markup(
+        f'<picture style="display: contents">'
+        f'<source type="image/webp" srcset="{escape(srcset(entry["webp"]))}" sizes="{escape(sizes)}">'
+        f'<img src="{escape(src)}" srcset="{escape(srcset(entry["fallback"]))}" sizes="{escape(sizes)}"'
+        f' alt="{escape(alt)}"{extra}>'
+        f'</picture>'
+    )
+
+
+# Static assets: `flask build-assets` concatenates and minifies each bundle below
+# (files are relative to static/ and kept in the order the pages loaded them),
+# names the result after its content hash and writes .gz/.br siblings to static/dist.
+# Third-party libraries are vendored, already minified, under static/vendor.
+ASSET_BUNDLES = {
+    'vendor.css': ['vendor/bootstrap/css/bootstrap.min.css', 'vendor/bootstrap-icons/bootstrap-icons.min.css',
+                   'vendor/fontawesome/css/all.min.css'],
+    'vendor.js': ['vendor/popper/popper.min.js', 'vendor/bootstrap/js/bootstrap.min.js'],
+    'site.css': ['styles.css'],
+    'home.css': ['styles.css', 'indexStyles.css', 'more-to-explore-carousel.css'],
+    'visit-page.css': ['styles.css', 'indexStyles.css', 'visit.css'],
+    'exhibition-index.css': ['styles.css', 'indexStyles.css', 'exhibition.css'],
+    'exhibition-detail.css': ['styles.css', 'exhibition.css', 'exhibitionPages.css'],
+    'exhibition-objects.css': ['exhibition_objects.css', 'styles.css', 'exhibition.css', 'exhibitionPages.css'],
+    'collection.css': ['styles.css', 'card-looks.css'],
+    'artifacts-index.css': ['styles.css', 'artifacts.css'],
+    'events-index.css': ['styles.css', 'events.css'],
+    'admin.css': ['adminDashboard.css'],
+    'home.js': ['imgCarousel.js', 'more-to-explore-carousel.js'],
+    'exhibition-index.js': ['imgCarousel.js', 'exhibition.js'],
+    'exhibition-objects.js': ['exhibition_objects.js'],
+    'collection.js': ['card-looks.js'],
+    'search.js': ['search-suggest.js'],
+}
+# Icon stylesheets whose rules and fonts are cut down to the icons the templates use
+ICON_STYLESHEETS = ('vendor/bootstrap-icons/bootstrap-icons.min.css', 'vendor/fontawesome/css/all.min.css')
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf')
+ASSET_DIR = 'dist'
+ASSET_MANIFEST = os.path.join(app.static_folder, ASSET_DIR, 'manifest.json')
+ASSET_MAX_AGE = 365 * 24 * 60 * 60  # fingerprinted files never change, so cache them for a year
+
+_asset_manifest = None
+_CSS_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+_CSS_URL = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)\s]*))\s*\)""")
+_ICON_RULE = re.compile(r'(?<=\})((?:\.[\w-]+::?before,?)+)\{content:"\\([0-9a-fA-F]+)"\}')
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet, leaving quoted strings alone."""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    parts = _CSS_STRING.split(source)
+    for i in range(0, len(parts), 2):  # even items are outside quotes
+        text = re.sub(r'\s+', ' ', parts[i])
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        parts[i] = re.sub(r':\s+', ':', text)
+    return ''.join(parts).replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """Drop indentation, blank lines and whole-line comments; newlines stay so semicolon insertion is unaffected."""
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def read_asset(filename):
+    """Read a static source file, pointing its relative url()s at /static/ so it still works once bundled."""
+    with open(os.path.join(app.static_folder, filename), encoding='utf-8') as f:
+        source = f.read()
+    # Source maps are not vendored
+    source = re.sub(r'^//# sourceMappingURL=.*$|/\*# sourceMappingURL=.*?\*/', '', source, flags=re.M)
+    if not filename.endswith('.css'):
+        return source
+
+    def absolute(match):
+        url = next(group for group in match.groups() if group is not None)
+        if not url or url.startswith(('data:', '/', '#')) or '://' in url:
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(filename), url))
+        return f'url("{app.static_url_path}/{path}")'
+    return _CSS_URL.sub(absolute, source)
+
+
+def bundle_source(name):
+    """Concatenate the unminified source files of a bundle."""
+    contents = [read_asset(filename) for filename in ASSET_BUNDLES[name]]
+    # The separator keeps a script without a trailing semicolon from running into the next one
+    return ('\n' if name.endswith('.css') else '\n;\n').join(contents)
+
+
+def icons_in_use():
+    """Collect the bi-*/fa-* class names mentioned in the templates and the site's own scripts."""
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    paths = [os.path.join(template_dir, name) for name in os.listdir(template_dir)]
+    paths += [os.path.join(app.static_folder, name) for name in os.listdir(app.static_folder) if name.endswith('.js')]
+    used = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            used.update(re.findall(r'\b(?:bi|fa)-[\w-]+', f.read()))
+    return used
+
+
+def trim_icon_rules(css, used):
+    """Drop icon rules for classes nothing uses; return the trimmed CSS and the codepoints still referenced."""
+    codepoints = set()
+
+    def trim(match):
+        kept = [selector for selector in match.group(1).split(',') if selector and selector[1:].split(':')[0] in used]
+        if not kept:
+            return ''
+        codepoints.add(int(match.group(2), 16))
+        return f'{",".join(kept)}{{content:"\\{match.group(2)}"}}'
+    return _ICON_RULE.sub(trim, css), codepoints
+
+
+def subset_font(data, ext, codepoints):
+    """Cut a font file down to the given codepoints, keeping its format."""
+    from fontTools import subset
+
+    # fontTools warns about harmless quirks in the vendored fonts
+    logging.getLogger('fontTools').setLevel(logging.ERROR)
+    options = subset.Options()
+    options.flavor = {'.woff2': 'woff2', '.woff': 'woff'}.get(ext)
+    options.layout_features = ['*']
+    font = subset.load_font(io.BytesIO(data), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+def write_asset(name, body):
+    """Write body to static/dist under a content-hashed version of name, with compressed siblings."""
+    stem, ext = os.path.splitext(os.path.basename(name))
+    hashed = f"{stem}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+    path = os.path.join(app.static_folder, ASSET_DIR, hashed)
+    with open(path, 'wb') as f:
+        f.write(body)
+    if ext in ('.woff2', '.woff'):  # already compressed
+        return hashed
+    with open(path + '.gz', 'wb') as f:
+        # mtime=0 keeps the output byte-identical between builds
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(body, quality=11))
+    return hashed
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Bundle, minify and fingerprint ASSET_BUNDLES into static/dist with gzip/brotli siblings."""
+    if brotli is None:
+        print("brotli is not installed; writing gzip siblings only.")
+    try:
+        import fontTools.subset  # noqa: F401
+        can_subset = True
+    except ImportError:
+        can_subset = False
+        print("fontTools is not installed; icon fonts are copied without subsetting.")
+
+    out_dir = os.path.join(app.static_folder, ASSET_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    used_icons = icons_in_use()
+    static_prefix = app.static_url_path + '/'
+    manifest = {}
+    for name, filenames in ASSET_BUNDLES.items():
+        parts = []
+        for filename in filenames:
+            source = read_asset(filename)
+            codepoints = None
+            if filename in ICON_STYLESHEETS:
+                source, codepoints = trim_icon_rules(source, used_icons)
+
+            def relocate_font(match):
+                # Fonts are fingerprinted into static/dist next to the bundle, so a relative name is enough
+                path = next(group for group in match.groups() if group is not None).split('?')[0].split('#')[0]
+                if not path.startswith(static_prefix) or not path.endswith(FONT_EXTENSIONS):
+                    return match.group(0)
+                font = path[len(static_prefix):]
+                if font not in manifest:
+                    with open(os.path.join(app.static_folder, font), 'rb') as f:
+                        data = f.read()
+                    if codepoints is not None and can_subset:
+                        try:
+                            data = subset_font(data, os.path.splitext(font)[1], codepoints)
+                        except Exception as e:
+                            log.warning("Could not subset %s, copying the whole font instead: %s", font, e)
+                    manifest[font] = write_asset(font, data)
+                    print(f"{font} -> {ASSET_DIR}/{manifest[font]} ({len(data)} bytes)")
+                return f'url("{manifest[font]}")'
+
+            if filename.endswith('.css'):
+                source = _CSS_URL.sub(relocate_font, source)
+            if '.min.' not in filename:
+                source = minify_css(source) if filename.endswith('.css') else minify_js(source)
+            parts.append(source.strip())
+        body = ('\n' if name.endswith('.css') else '\n;\n').join(parts).encode('utf-8')
+        manifest[name] = write_asset(name, body)
+        print(f"{name} -> {ASSET_DIR}/{manifest[name]} ({len(body)} bytes)")
+
+    # Drop files left behind by earlier builds
+    for filename in os.listdir(out_dir):
+        if filename != 'manifest.json' and filename.removesuffix('.gz').removesuffix('.br') not in manifest.values():
+            os.remove(os.path.join(out_dir, filename))
+
+    with open(ASSET_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def get_asset_manifest():
+    """Return the bundle/font name -> fingerprinted filename map ({} until `flask build-assets` has run)."""
+    global _asset_manifest
+    if _asset_manifest is None:
+        try:
+            with open(ASSET_MANIFEST) as f:
+                _asset_manifest = json.load(f)
+        except (OSError, ValueError):
+            _asset_manifest = {}
+    return _asset_manifest
+
+
+@app.template_global()
+def asset_url(name):
+    """url_for() for ASSET_BUNDLES: the fingerprinted build when present, otherwise the unminified bundle."""
+    hashed = get_asset_manifest().get(name)
+    if hashed is not None:
+        return url_for('static', filename=f"{ASSET_DIR}/{hashed}")
+    return url_for('asset_bundle', name=name)
+
+
+@app.route('/assets/<name>')
+def asset_bundle(name):
+    """Serve a bundle straight from its sources, for development before `flask build-assets`."""
+    if name not in ASSET_BUNDLES:
+        abort(404)
+    response = make_response(bundle_source(name))
+    response.mimetype = 'text/css' if name.endswith('.css') else 'text/javascript'
+    return response
+
+
+def static_file(filename):
+    """Flask's static view, plus far-future caching and precompressed bodies for fingerprinted bundles."""
+    directory, _, hashed = filename.partition('/')
+    if directory != ASSET_DIR or hashed not in get_asset_manifest().values():
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(hashed)[0]
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.exists(os.path.join(app.static_folder, filename + suffix)):
+            response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+            response.content_encoding = encoding
+            break
     else:
-        print("Error: Cannot create database connection.")
+        response = app.send_static_file(filename)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = ASSET_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+app.view_functions['static'] = static_file
+
+
+# Response compression: text responses are gzip- or brotli-compressed on the way out
+# unless they are small, already encoded (e.g. the precompressed bundles above) or
+# marked no-transform. Level and threshold can be tuned from the environment.
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies are not worth the CPU
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip, 1-9
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))  # 0-11; above ~6 is too slow per request
+COMPRESS_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/javascript', 'application/json', 'application/x-ndjson', 'application/xml', 'image/svg+xml',
+)
+
+
+def accepted_encoding(accept_encoding):
+    """Pick the content coding to use for an Accept-Encoding header: 'br', 'gzip' or None."""
+    accept = parse_accept_header(accept_encoding)
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+
+def new_compressor(encoding):
+    """Return (compress, flush, finish) callables for a streaming compressor."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress_middleware(wsgi_app):
+    """Wrap a WSGI app so compressible responses are encoded for clients that accept it."""
+    def middleware(environ, start_response):
+        encoding = accepted_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return wsgi_app(environ, start_response)
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+        return compressed_body(wsgi_app(environ, capture), captured, encoding, start_response)
+    return middleware
+
+
+def compressed_body(body, captured, encoding, start_response):
+    """Send the app's response on, compressing it chunk by chunk if it qualifies."""
+    try:
+        # Read ahead up to the threshold so small responses go out untouched
+        chunks = iter(body)
+        pending, size = [], 0
+        for chunk in chunks:
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= COMPRESS_MIN_SIZE:
+                break
+
+        status, headers, exc_info = captured
+        headers = Headers(headers)
+        mimetype = headers.get('Content-Type', '').split(';')[0].strip()
+        compressible = (
+            mimetype in COMPRESS_MIMETYPES
+            and int(status.split()[0]) not in (204, 206, 304)
+            and 'Content-Encoding' not in headers
+            and 'no-transform' not in headers.get('Cache-Control', '')
+        )
+        vary = headers.get('Vary', '')
+        if compressible and 'accept-encoding' not in vary.lower():
+            headers['Vary'] = f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'
+        if not compressible or size < COMPRESS_MIN_SIZE:
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            yield from pending
+            yield from chunks
+            return
+
+        headers['Content-Encoding'] = encoding
+        headers.remove('Content-Length')
+        # The encoded bytes differ from the identity body, so the validator can only be weak
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = f"W/{etag}"
+        start_response(status, headers.to_wsgi_list(), exc_info)
+
+        compress, flush, finish = new_compressor(encoding)
+        yield compress(b''.join(pending)) + flush()
+        for chunk in chunks:
+            # Flushing per chunk keeps streamed responses streaming
+            yield compress(chunk) + flush()
+        yield finish()
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+
+
+@app.after_request
+def weaken_not_modified_etag(response):
+    """Give a 304 the same weak ETag the middleware puts on the compressed 200 it stands in for.
+
+    Werkzeug strips Content-Type from a 304 before the middleware sees it, so
+    the decision is made here, where the mimetype is still known. There is no
+    body to measure, so the full response is assumed to pass COMPRESS_MIN_SIZE.
+    """
+    if (response.status_code == 304
+            and accepted_encoding(request.headers.get('Accept-Encoding', '')) is not None
+            and response.mimetype in COMPRESS_MIMETYPES
+            and 'Content-Encoding' not in response.headers
+            and 'no-transform' not in response.headers.get('Cache-Control', '')):
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+app.wsgi_app = compress_middleware(app.wsgi_app)
+
+# Number of reverse proxies in front of the app. Each one appends to
+# X-Forwarded-For, so request.remote_addr (which the login throttle keys on)
+# is the real client rather than the proxy. Leave at 0 when clients connect
+# directly, or anyone could pick their own address with the header.
+PROXY_HOPS = int(os.getenv('PROXY_HOPS', 0))
+if PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS, x_proto=PROXY_HOPS)
+
+
+# Password hashing runs on a small bounded pool so a burst of sign-ins cannot
+# occupy every request thread with CPU-bound key stretching. Work beyond the
+# pool plus its queue is refused at once (503) instead of piling up, and token
+# buckets per client IP and per account turn away brute-force attempts (429)
+# before they cost a hash at all.
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')  # werkzeug method string
+HASH_WORKERS = int(os.getenv('HASH_WORKERS', min(4, os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.getenv('HASH_QUEUE_LIMIT', HASH_WORKERS * 4))
+HASH_TIMEOUT = 10  # seconds a request waits for its hash before giving up
+# (burst, tokens regained per second): 20 attempts per IP then one every 3 s,
+# 5 per account then one every 30 s
+THROTTLE_IP = (int(os.getenv('THROTTLE_IP_BURST', 20)), float(os.getenv('THROTTLE_IP_RATE', 1 / 3)))
+THROTTLE_ACCOUNT = (int(os.getenv('THROTTLE_ACCOUNT_BURST', 5)), float(os.getenv('THROTTLE_ACCOUNT_RATE', 1 / 30)))
+THROTTLE_MAX_KEYS = 10000  # least recently seen buckets are dropped past this
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='password-hash')
+_hash_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_LIMIT)
+_buckets = OrderedDict()
+_buckets_lock = threading.Lock()
+
+
+def take_token(key, limits):
+    """Spend one token from key's bucket; return 0 if allowed, else the seconds until one is available."""
+    burst, rate = limits
+    now = time.monotonic()
+    with _buckets_lock:
+        tokens, stamp = _buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * rate)
+        wait = 0 if tokens >= 1 else (1 - tokens) / rate
+        if not wait:
+            tokens -= 1
+        _buckets[key] = (tokens, now)
+        while len(_buckets) > THROTTLE_MAX_KEYS:
+            _buckets.popitem(last=False)
+    return wait
+
+
+def throttle(account=None):
+    """Charge this attempt to the client IP (and account, if given); return the Retry-After seconds or 0."""
+    wait = take_token(('ip', request.remote_addr), THROTTLE_IP)
+    if not wait and account:
+        wait = take_token(('account', account.lower()), THROTTLE_ACCOUNT)
+    return int(wait) + 1 if wait else 0
+
+
+def run_hash(func, *args):
+    """Run func on the hashing pool and return its result, or None if the pool is saturated."""
+    if not _hash_slots.acquire(blocking=False):
+        return None
+    try:
+        future = _hash_pool.submit(func, *args)
+    except RuntimeError:  # pool shut down at exit
+        _hash_slots.release()
+        return None
+    future.add_done_callback(lambda _: _hash_slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except TimeoutError:
+        return None
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
 
-# Initialize the database when the app starts
-init_db()
+@functools.cache
+def password_hash_prefix():
+    """The method prefix werkzeug actually writes ('scrypt' is stored as 'scrypt:32768:8:1').
+
+    Worked out on the first verify rather than at import, so worker start-up
+    and CLI commands do not pay for a hash.
+    """
+    return hash_password('').split('$', 1)[0]
+
+
+def verify_password(stored_hash, password):
+    """Check a password; return (matches, new hash if the stored one uses outdated parameters)."""
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if stored_hash.split('$', 1)[0] != password_hash_prefix():
+        return True, hash_password(password)
+    return True, None
+
+
+def too_many_attempts(template, errors, retry_after):
+    response = make_response(render_template(template, errors=errors), 429)
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def server_busy(template, errors):
+    response = make_response(render_template(template, errors=errors), 503)
+    response.headers['Retry-After'] = '1'
+    return response
 
 
 @app.route('/register', methods=['GET', 'POST'])
@@ -175,16 +2166,24 @@ def register():
         if not zip_code:
             errors['zip_code'] = 'Zip code is required.'
 
+        retry_after = throttle()
+        if retry_after:
+            errors['database'] = 'Too many attempts. Please wait a moment and try again.'
+            return too_many_attempts('register.html', errors, retry_after)
+
         # If no errors, proceed with the registration logic
         if not errors:
             conn = None
             cursor = None
             try:
-                # Hash the password using the default method (pbkdf2:sha256)
-                hashed_password = generate_password_hash(password)
+                # Hash the password on the bounded hashing pool (PASSWORD_HASH_METHOD)
+                hashed_password = run_hash(hash_password, password)
+                if hashed_password is None:
+                    errors['database'] = 'The server is busy. Please try again in a moment.'
+                    return server_busy('register.html', errors)
 
                 # Connect to the SQLite database
-                conn = create_connection()
+                conn = get_db()
                 cursor = conn.cursor()
 
                 # Insert user data into the database
@@ -208,8 +2207,6 @@ def register():
             finally:
                 if cursor:
                     cursor.close()
-                if conn:
-                    conn.close()
 
     # Render the registration template with errors (if any)
     return render_template('register.html', errors=errors)
@@ -234,14 +2231,33 @@ def login():
 
         # If no errors, proceeding with login logic
         if not errors:
-            conn = create_connection()
+            retry_after = throttle(f"users:{email}")
+            if retry_after:
+                errors['login'] = 'Too many login attempts. Please wait a moment and try again.'
+                return too_many_attempts('login.html', errors, retry_after)
+
+            conn = get_db()
             cursor = conn.cursor()
 
             # Fetch the user's hashed password from the database
             cursor.execute("SELECT password FROM users WHERE email = ?", (email,))
             user = cursor.fetchone()
 
-            if user and check_password_hash(user[0], password):
+            result = run_hash(verify_password, user[0], password) if user else (False, None)
+            if result is None:
+                cursor.close()
+                errors['login'] = 'The server is busy. Please try again in a moment.'
+                return server_busy('login.html', errors)
+
+            matches, new_hash = result
+            if matches:
+                if new_hash:
+                    # Stored with older hashing parameters: upgrade it now we know the password
+                    try:
+                        cursor.execute("UPDATE users SET password = ? WHERE email = ?", (new_hash, email))
+                        conn.commit()
+                    except Error as e:
+                        log.error("Error rehashing password: %s", e)
                 # Password is correct, proceed with login
                 session['user_email'] = email
                 return redirect(url_for('home'))
@@ -249,7 +2265,6 @@ def login():
                 errors['login'] = 'Invalid email or password.'
 
             cursor.close()
-            conn.close()
 
     # Render the login template with errors (if any)
     return render_template('login.html', errors=errors)
@@ -288,16 +2303,24 @@ def adminRegister():
         elif password != confirm_password:
             errors['confirm_password'] = 'Passwords do not match.'
 
+        retry_after = throttle()
+        if retry_after:
+            errors['database'] = 'Too many attempts. Please wait a moment and try again.'
+            return too_many_attempts('adminRegister.html', errors, retry_after)
+
         # If no errors, proceed with the registration logic
         if not errors:
             conn = None
             cursor = None
             try:
-                # Hash the password using the default method (pbkdf2:sha256)
-                hashed_password = generate_password_hash(password)
+                # Hash the password on the bounded hashing pool (PASSWORD_HASH_METHOD)
+                hashed_password = run_hash(hash_password, password)
+                if hashed_password is None:
+                    errors['database'] = 'The server is busy. Please try again in a moment.'
+                    return server_busy('adminRegister.html', errors)
 
                 # Connect to the SQLite database
-                conn = create_connection()
+                conn = get_db()
                 cursor = conn.cursor()
 
                 # Insert admin data into the database
@@ -321,8 +2344,6 @@ def adminRegister():
             finally:
                 if cursor:
                     cursor.close()
-                if conn:
-                    conn.close()
 
     # Render the admin registration template with errors (if any)
     return render_template('adminRegister.html', errors=errors)
@@ -347,14 +2368,33 @@ def adminLogin():
 
         # If no errors, proceeding with login logic
         if not errors:
-            conn = create_connection()
+            retry_after = throttle(f"admins:{email}")
+            if retry_after:
+                errors['login'] = 'Too many login attempts. Please wait a moment and try again.'
+                return too_many_attempts('adminLogin.html', errors, retry_after)
+
+            conn = get_db()
             cursor = conn.cursor()
 
             # Fetch the admin's hashed password from the database
             cursor.execute("SELECT password FROM admins WHERE email = ?", (email,))
             admin = cursor.fetchone()
 
-            if admin and check_password_hash(admin[0], password):
+            result = run_hash(verify_password, admin[0], password) if admin else (False, None)
+            if result is None:
+                cursor.close()
+                errors['login'] = 'The server is busy. Please try again in a moment.'
+                return server_busy('adminLogin.html', errors)
+
+            matches, new_hash = result
+            if matches:
+                if new_hash:
+                    # Stored with older hashing parameters: upgrade it now we know the password
+                    try:
+                        cursor.execute("UPDATE admins SET password = ? WHERE email = ?", (new_hash, email))
+                        conn.commit()
+                    except Error as e:
+                        log.error("Error rehashing password: %s", e)
                 # Password is correct, proceed with login
                 session['admin_email'] = email
                 return redirect(url_for('adminDashboard'))
@@ -362,17 +2402,37 @@ def adminLogin():
                 errors['login'] = 'Invalid email or password.'
 
             cursor.close()
-            conn.close()
 
     # Render the admin login template with errors (if any)
     return render_template('adminLogin.html', errors=errors)
 
+# All dashboard counters plus the five newest exhibitions in a single round trip.
+# Each row repeats the counters; there is one all-NULL exhibition row if none exist.
+DASHBOARD_QUERY = """
+    WITH counts AS (
+        SELECT MAX(CASE WHEN name = 'exhibitions' THEN value END) AS exhibitions,
+               MAX(CASE WHEN name = 'events' THEN value END) AS events,
+               MAX(CASE WHEN name = 'artifacts' THEN value END) AS artifacts,
+               MAX(CASE WHEN name = 'users' THEN value END) AS users
+        FROM stats
+    ), recent AS (
+        SELECT id, exhibit_name, location, start_date, end_date, description
+        FROM exhibitions
+        WHERE category != 'Events'
+        ORDER BY id DESC
+        LIMIT 5
+    )
+    SELECT counts.*, recent.*
+    FROM counts LEFT JOIN recent ON 1
+    ORDER BY recent.id DESC
+"""
+
 @app.route('/adminDashboard')
 def adminDashboard():
     if 'admin_email' not in session:
         return redirect(url_for('adminLogin'))
     
-    conn = create_connection()
+    conn = get_db()
     try:
         data = {
             'counts': {
@@ -385,53 +2445,20 @@ def adminDashboard():
         }
         
         if conn is not None:
+            # Counters come from the trigger-maintained stats table, so this
+            # is one cheap statement whatever the size of the catalogue
             cursor = conn.cursor()
-            
-            # Debug: Print all distinct categories in exhibitions table
-            cursor.execute("SELECT DISTINCT category FROM exhibitions")
-            categories = cursor.fetchall()
-            # print("Existing categories in exhibitions table:", categories)
-            
-            # Get event count - let's try different variations
-            queries = [
-                ('SELECT COUNT(*) FROM exhibitions WHERE category = "Event"', 'Exact match "Event"'),
-                ('SELECT COUNT(*) FROM exhibitions WHERE category LIKE "%Event%"', 'Contains "Event"'),
-                ('SELECT COUNT(*) FROM exhibitions WHERE LOWER(category) = "event"', 'Lowercase "event"'),
-                ('SELECT COUNT(*) FROM exhibitions', 'All exhibitions')
-            ]
-            
-            for query, description in queries:
-                cursor.execute(query)
-                count = cursor.fetchone()[0]
-                if "Event" in description:
-                    data['counts']['events'] = count
-            
-            # Get other counts
-            cursor.execute('SELECT COUNT(*) FROM exhibitions WHERE category != "Event"')
-            data['counts']['exhibitions'] = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM artifacts')
-            data['counts']['artifacts'] = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM users')
-            data['counts']['users'] = cursor.fetchone()[0]
-            
-            # Get recent exhibitions
-            cursor.execute('''
-                SELECT id, exhibit_name, location, start_date, end_date, description 
-                FROM exhibitions 
-                WHERE category != "Event"
-                ORDER BY id DESC 
-                LIMIT 5
-            ''')
-            columns = ['id', 'exhibit_name', 'location', 'start_date', 'end_date', 'description']
-            data['recent_exhibitions'] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            cursor.execute(DASHBOARD_QUERY)
+            for row in cursor.fetchall():
+                for name in data['counts']:
+                    data['counts'][name] = row[name] or 0
+                if row['id'] is not None:
+                    data['recent_exhibitions'].append(
+                        {column: row[column] for column in
+                         ('id', 'exhibit_name', 'location', 'start_date', 'end_date', 'description')})
             
     except Error as e:
-        print(f"Database error: {e}")
-    finally:
-        if conn:
-            conn.close()
+        log.error("Database error: %s", e)
     
     return render_template('adminDashboard.html', 
                          now=datetime.now(),
@@ -442,6 +2469,178 @@ def adminLogout():
     session.pop('admin_email', None)  # Remove the admin's email from the session
     return redirect(url_for('home'))
 
+# Request metrics, kept per worker process and served at /metrics in the
+# Prometheus text format: latency histogram, request/status counts, response
+# bytes, SQL statement count and time, and template render time per endpoint.
+# Requests are measured until their body has been sent in full.
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # lets a scraper authenticate with "Authorization: Bearer <token>"
+
+# endpoint -> [bucket counts..., +Inf count, latency sum, response bytes, SQL statements, SQL seconds, template seconds]
+_metrics = {}
+_metrics_status = {}  # (endpoint, status) -> requests
+_metrics_lock = threading.Lock()
+_N_BUCKETS = len(METRICS_BUCKETS) + 1
+
+
+@app.before_request
+def start_request_metrics():
+    _thread_local.sql = [0, 0.0]
+    _thread_local.template_time = 0.0
+
+
+@app.after_request
+def record_request_metrics(response):
+    # Recorded when the server closes the response, so streamed bodies and the
+    # queries they run while streaming are included
+    response.call_on_close(functools.partial(
+        _record_request_metrics, request.endpoint or 'none', g.get('request_started', time.perf_counter()),
+        response.status_code, response.content_length))
+    return response
+
+
+def _record_request_metrics(endpoint, started, status, content_length):
+    elapsed = time.perf_counter() - started
+    statements, sql_time = getattr(_thread_local, 'sql', None) or (0, 0.0)
+    _thread_local.sql = None
+    with _metrics_lock:
+        series = _metrics.get(endpoint)
+        if series is None:
+            series = _metrics[endpoint] = [0] * _N_BUCKETS + [0.0, 0, 0, 0.0, 0.0]
+        series[bisect.bisect_left(METRICS_BUCKETS, elapsed)] += 1
+        series[_N_BUCKETS] += elapsed
+        series[_N_BUCKETS + 1] += content_length or 0
+        series[_N_BUCKETS + 2] += statements
+        series[_N_BUCKETS + 3] += sql_time
+        series[_N_BUCKETS + 4] += getattr(_thread_local, 'template_time', 0.0)
+        key = (endpoint, status)
+        _metrics_status[key] = _metrics_status.get(key, 0) + 1
+
+
+@before_render_template.connect_via(app)
+def _template_started(sender, template, context, **extra):
+    _thread_local.template_started = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def _template_finished(sender, template, context, **extra):
+    started = getattr(_thread_local, 'template_started', None)
+    if started is not None and getattr(_thread_local, 'template_time', None) is not None:
+        _thread_local.template_time += time.perf_counter() - started
+
+
+def render_metrics():
+    """Return the collected metrics in the Prometheus text exposition format."""
+    with _metrics_lock:
+        series = {endpoint: list(values) for endpoint, values in _metrics.items()}
+        statuses = dict(_metrics_status)
+
+    lines = [
+        '# HELP museum_http_request_duration_seconds Time spent handling requests.',
+        '# TYPE museum_http_request_duration_seconds histogram',
+    ]
+    for endpoint, values in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(METRICS_BUCKETS + ('+Inf',), values):
+            cumulative += count
+            lines.append(f'museum_http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+        lines.append(f'museum_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {values[_N_BUCKETS]:.6f}')
+        lines.append(f'museum_http_request_duration_seconds_count{{endpoint="{endpoint}"}} {cumulative}')
+
+    lines += ['# HELP museum_http_requests_total Requests by endpoint and status.',
+              '# TYPE museum_http_requests_total counter']
+    lines += [f'museum_http_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}'
+              for (endpoint, status), count in sorted(statuses.items())]
+
+    for offset, name, help_text in (
+        (1, 'museum_http_response_bytes_total', 'Response body bytes (streamed bodies are not counted).'),
+        (2, 'museum_sql_statements_total', 'SQL statements executed.'),
+        (3, 'museum_sql_seconds_total', 'Time spent executing SQL statements.'),
+        (4, 'museum_template_render_seconds_total', 'Time spent rendering templates.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        lines += [f'{name}{{endpoint="{endpoint}"}} {values[_N_BUCKETS + offset]:g}'
+                  for endpoint, values in sorted(series.items())]
+    return '\n'.join(lines) + '\n'
+
+
+@app.route('/metrics')
+def metrics():
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (METRICS_TOKEN and hmac.compare_digest(token, METRICS_TOKEN)) and 'admin_email' not in session:
+        return redirect(url_for('adminLogin'))
+    response = make_response(render_metrics())
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.cache_control.no_store = True
+    return response
+
+@app.route('/adminSlowQueries')
+def adminSlowQueries():
+    """The statements that crossed SLOW_QUERY_MS in this worker since it started, worst total time first."""
+    if 'admin_email' not in session:
+        return redirect(url_for('adminLogin'))
+    with _slow_queries_lock:
+        queries = [dict(entry, endpoints=sorted(entry['endpoints'])) for entry in _slow_queries.values()]
+    queries.sort(key=lambda entry: entry['total'], reverse=True)
+    return render_template('adminSlowQueries.html', queries=queries, threshold=SLOW_QUERY_MS)
+
+# Admin table page sizes (?limit=) and the columns each table actually shows
+ADMIN_PAGE_SIZE = 50
+ADMIN_MAX_PAGE_SIZE = 200
+ADMIN_TABLE_COLUMNS = {
+    'exhibitions': ('id', 'exhibit_name', 'location', 'category',
+                    'start_date', 'end_date', 'opening_time', 'closing_time'),
+    'artifacts': ('id', 'item_name', 'category', 'origin', 'historical_period', 'location'),
+    'exhibition_objects': ('id', 'title', 'creator', 'date'),
+}
+
+
+def paginate(conn, table, columns=None, where='1', params=(), page_size=ADMIN_PAGE_SIZE,
+             max_page_size=ADMIN_MAX_PAGE_SIZE):
+    """Fetch one keyset page of a table, driven by ?after_id= / ?before_id= and ?limit=.
+
+    Returns the rows (oldest first) and a dict with the ids the previous/next
+    links should continue from; each page costs an index range scan on id
+    however large the table is. columns defaults to the admin table's
+    ADMIN_TABLE_COLUMNS; where/params narrow the rows (index it with id).
+    """
+    limit = request.args.get('limit', page_size, type=int)
+    limit = max(1, min(limit, max_page_size))
+    after_id = request.args.get('after_id', type=int)
+    before_id = request.args.get('before_id', type=int)
+    columns = columns or ', '.join(ADMIN_TABLE_COLUMNS[table])
+    params = tuple(params)
+
+    cursor = conn.cursor()
+    if before_id is not None:
+        # Walk backwards from before_id, then restore ascending order
+        cursor.execute(f"SELECT {columns} FROM {table} WHERE {where} AND id < ? ORDER BY id DESC LIMIT ?",
+                       params + (before_id, limit + 1))
+        rows = cursor.fetchall()
+        has_prev = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_next = True
+    else:
+        cursor.execute(f"SELECT {columns} FROM {table} WHERE {where} AND id > ? ORDER BY id LIMIT ?",
+                       params + (after_id or 0, limit + 1))
+        rows = cursor.fetchall()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        has_prev = bool(after_id)
+
+    if rows and has_prev and before_id is None:
+        # Only offer "Previous" when something really precedes this page
+        has_prev = cursor.execute(f"SELECT 1 FROM {table} WHERE {where} AND id < ? LIMIT 1",
+                                  params + (rows[0]['id'],)).fetchone() is not None
+
+    page = {
+        'limit': limit,
+        'prev_before': rows[0]['id'] if rows and has_prev else None,
+        'next_after': rows[-1]['id'] if rows and has_next else None,
+    }
+    return rows, page
+
+
 @app.route('/section_exhibition', methods=['GET', 'POST'])
 def section_exhibition():
     if request.method == 'POST':
@@ -457,39 +2656,36 @@ def section_exhibition():
         description = request.form.get('description')
 
         # Insert data into the database
-        conn = create_connection()
+        conn = get_db()
         if conn is not None:
             try:
                 cursor = conn.cursor()
+                slug = unique_exhibition_slug(cursor, exhibit_name)
                 cursor.execute("""
-                    INSERT INTO exhibitions (exhibit_name, location, category, image_filename, start_date, end_date, opening_time, closing_time, description)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (exhibit_name, location, category, image_filename, start_date, end_date, opening_time, closing_time, description))
+                    INSERT INTO exhibitions (exhibit_name, location, category, image_filename, start_date, end_date, opening_time, closing_time, description, slug)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (exhibit_name, location, category, image_filename, start_date, end_date, opening_time, closing_time, description, slug))
                 conn.commit()
-                print("Exhibitions data inserted successfully.")
+                refresh_suggestions(conn, 'exhibitions', cursor.lastrowid)
+                log.info("Exhibitions data inserted successfully.")
             except Error as e:
-                print(f"Error inserting exhibitions data: {e}")
-            finally:
-                conn.close()
+                log.error("Error inserting exhibitions data: %s", e)
 
         # Redirect to the same page to refresh the table
         return redirect(url_for('section_exhibition'))
 
     # Fetch exhibit data for the table
-    conn = create_connection()
+    conn = get_db()
     exhibitions = []
+    page = None
     if conn is not None:
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions")
-            exhibitions = cursor.fetchall()  # Fetch all rows from the exhibits table
+            exhibitions, page = paginate(conn, 'exhibitions')  # One page of the exhibits table
         except Error as e:
-            print(f"Error fetching exhibitions: {e}")
-        finally:
-            conn.close()
+            log.error("Error fetching exhibitions: %s", e)
 
     # Render the template with the form and exhibit data
-    return render_template('section_exhibition.html', exhibitions=exhibitions)
+    return render_template('section_exhibition.html', exhibitions=exhibitions, page=page)
 
 @app.route('/delete_exhibition/<int:exhibit_id>', methods=['POST'])
 def delete_exhibition(exhibit_id):
@@ -498,12 +2694,15 @@ def delete_exhibition(exhibit_id):
     
     if request.method == 'POST':
         try:
-            conn = create_connection()
+            conn = get_db()
+            slug = exhibition_slug(conn, exhibit_id)
+            conn.execute('UPDATE exhibition_objects SET exhibition_id = NULL WHERE exhibition_id = ?', (exhibit_id,))
             conn.execute('DELETE FROM exhibitions WHERE id = ?', (exhibit_id,))
             conn.commit()
-            conn.close()
+            invalidate_exhibition_cache(slug)
+            refresh_suggestions(conn, 'exhibitions', exhibit_id)
         except Exception as e:
-            print(f"Error deleting exhibition: {e}")
+            log.error("Error deleting exhibition: %s", e)
     
     return redirect(url_for('section_exhibition'))
 
@@ -512,9 +2711,8 @@ def edit_exhibition(exhibit_id):
     if 'admin_email' not in session:
         return redirect(url_for('adminLogin'))
     
-    conn = create_connection()
+    conn = get_db()
     exhibition = conn.execute('SELECT * FROM exhibitions WHERE id = ?', (exhibit_id,)).fetchone()
-    conn.close()
     
     if not exhibition:
         return redirect(url_for('section_exhibition'))
@@ -539,7 +2737,8 @@ def update_exhibition(exhibit_id):
         description = request.form['description']
         
         try:
-            conn = create_connection()
+            conn = get_db()
+            slug = exhibition_slug(conn, exhibit_id)
             conn.execute("""
                 UPDATE exhibitions 
                 SET exhibit_name = ?, location = ?, category = ?, image_filename = ?,
@@ -548,12 +2747,19 @@ def update_exhibition(exhibit_id):
             """, (exhibit_name, location, category, image_filename, start_date, end_date,
                  opening_time, closing_time, description, exhibit_id))
             conn.commit()
-            conn.close()
+            invalidate_exhibition_cache(slug)
+            refresh_suggestions(conn, 'exhibitions', exhibit_id)
         except Exception as e:
-            print(f"Error updating exhibition: {e}")
+            log.error("Error updating exhibition: %s", e)
     
     return redirect(url_for('section_exhibition'))
 
+def get_exhibition_choices(conn):
+    """Return (id, exhibit_name) rows for the exhibition picker on the object forms."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, exhibit_name FROM exhibitions WHERE category = 'Exhibition' ORDER BY exhibit_name")
+    return cursor.fetchall()
+
 @app.route('/section_exhibition_objects', methods=['GET', 'POST'])
 def section_exhibition_objects():
     if request.method == 'POST':
@@ -567,40 +2773,39 @@ def section_exhibition_objects():
         credit = request.form.get('credit')
         description = request.form.get('description')
         image_filename = request.form.get('image_filename')
+        exhibition_id = request.form.get('exhibition_id') or None
 
         # Insert data into the database
-        conn = create_connection()
+        conn = get_db()
         if conn is not None:
             try:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO exhibition_objects 
-                    (title, creator, culture, date, medium, dimensions, credit, description, image_filename)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (title, creator, culture, date, medium, dimensions, credit, description, image_filename))
+                    (title, creator, culture, date, medium, dimensions, credit, description, image_filename, exhibition_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (title, creator, culture, date, medium, dimensions, credit, description, image_filename, exhibition_id))
                 conn.commit()
-                print("Exhibition object inserted successfully.")
+                refresh_suggestions(conn, 'exhibition_objects', cursor.lastrowid)
+                log.info("Exhibition object inserted successfully.")
             except Error as e:
-                print(f"Error inserting exhibition object: {e}")
-            finally:
-                conn.close()
+                log.error("Error inserting exhibition object: %s", e)
 
         return redirect(url_for('section_exhibition_objects'))
 
     # Fetch objects data for the table
-    conn = create_connection()
+    conn = get_db()
     objects = []
+    exhibitions = []
+    page = None
     if conn is not None:
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects")
-            objects = cursor.fetchall()
+            objects, page = paginate(conn, 'exhibition_objects')
+            exhibitions = get_exhibition_choices(conn)
         except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
+            log.error("Error fetching exhibition objects: %s", e)
 
-    return render_template('section_exhibition_objects.html', objects=objects)
+    return render_template('section_exhibition_objects.html', objects=objects, exhibitions=exhibitions, page=page)
 
 @app.route('/delete_exhibition_object/<int:object_id>', methods=['POST'])
 def delete_exhibition_object(object_id):
@@ -609,12 +2814,12 @@ def delete_exhibition_object(object_id):
     
     if request.method == 'POST':
         try:
-            conn = create_connection()
+            conn = get_db()
             conn.execute('DELETE FROM exhibition_objects WHERE id = ?', (object_id,))
             conn.commit()
-            conn.close()
+            refresh_suggestions(conn, 'exhibition_objects', object_id)
         except Exception as e:
-            print(f"Error deleting exhibition object: {e}")
+            log.error("Error deleting exhibition object: %s", e)
     
     return redirect(url_for('section_exhibition_objects'))
 
@@ -623,14 +2828,14 @@ def edit_exhibition_object(object_id):
     if 'admin_email' not in session:
         return redirect(url_for('adminLogin'))
     
-    conn = create_connection()
+    conn = get_db()
     object = conn.execute('SELECT * FROM exhibition_objects WHERE id = ?', (object_id,)).fetchone()
-    conn.close()
     
     if not object:
         return redirect(url_for('section_exhibition_objects'))
     
-    return render_template('edit_exhibition_object.html', object=object)
+    return render_template('edit_exhibition_object.html', object=object,
+                           exhibitions=get_exhibition_choices(conn))
 
 @app.route('/update_exhibition_object/<int:object_id>', methods=['POST'])
 def update_exhibition_object(object_id):
@@ -648,19 +2853,22 @@ def update_exhibition_object(object_id):
         credit = request.form['credit']
         description = request.form['description']
         image_filename = request.form['image_filename']
+        exhibition_id = request.form.get('exhibition_id') or None
         
         try:
-            conn = create_connection()
+            conn = get_db()
             conn.execute("""
                 UPDATE exhibition_objects 
                 SET title = ?, creator = ?, culture = ?, date = ?,
-                    medium = ?, dimensions = ?, credit = ?, description = ?, image_filename = ?
+                    medium = ?, dimensions = ?, credit = ?, description = ?, image_filename = ?,
+                    exhibition_id = ?
                 WHERE id = ?
-            """, (title, creator, culture, date, medium, dimensions, credit, description, image_filename, object_id))
+            """, (title, creator, culture, date, medium, dimensions, credit, description, image_filename,
+                  exhibition_id, object_id))
             conn.commit()
-            conn.close()
+            refresh_suggestions(conn, 'exhibition_objects', object_id)
         except Exception as e:
-            print(f"Error updating exhibition object: {e}")
+            log.error("Error updating exhibition object: %s", e)
     
     return redirect(url_for('section_exhibition_objects'))
 
@@ -678,7 +2886,7 @@ def section_artifacts():
         category_desc = request.form.get('category_desc')
 
         # Insert data into the database
-        conn = create_connection()
+        conn = get_db()
         if conn is not None:
             try:
                 cursor = conn.cursor()
@@ -687,39 +2895,35 @@ def section_artifacts():
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """, (item_name, category, origin, historical_period, location, image_filename, description, category_desc))
                 conn.commit()
-                print("Artifact data inserted successfully.")
+                invalidate_category_cache(category)
+                refresh_suggestions(conn, 'artifacts', cursor.lastrowid)
+                log.info("Artifact data inserted successfully.")
             except Error as e:
-                print(f"Error inserting artifact data: {e}")
-            finally:
-                conn.close()
+                log.error("Error inserting artifact data: %s", e)
 
         # Redirect to the same page to refresh the table
         return redirect(url_for('section_artifacts'))
 
     # Fetch exhibit data for the table
-    conn = create_connection()
+    conn = get_db()
     artifacts = []
+    page = None
     if conn is not None:
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts")
-            artifacts = cursor.fetchall()  # Fetch all rows from the artifacts table
+            artifacts, page = paginate(conn, 'artifacts')  # One page of the artifacts table
         except Error as e:
-            print(f"Error fetching artifacts: {e}")
-        finally:
-            conn.close()
+            log.error("Error fetching artifacts: %s", e)
 
     # Render the template with the form and exhibit data
-    return render_template('section_artifacts.html', artifacts=artifacts)
+    return render_template('section_artifacts.html', artifacts=artifacts, page=page)
 
 @app.route('/edit_artifact/<int:artifact_id>')
 def edit_artifact(artifact_id):
     if 'admin_email' not in session:
         return redirect(url_for('adminLogin'))
     
-    conn = create_connection()
+    conn = get_db()
     artifact = conn.execute('SELECT * FROM artifacts WHERE id = ?', (artifact_id,)).fetchone()
-    conn.close()
     
     if not artifact:
         return redirect(url_for('section_artifacts'))
@@ -743,7 +2947,7 @@ def update_artifact(artifact_id):
         category_desc = request.form['category_desc']
         
         try:
-            conn = create_connection()
+            conn = get_db()
             conn.execute("""
                 UPDATE artifacts 
                 SET item_name = ?, category = ?, origin = ?, historical_period = ?,
@@ -752,9 +2956,11 @@ def update_artifact(artifact_id):
             """, (item_name, category, origin, historical_period,
                  location, image_filename, description, category_desc, artifact_id))
             conn.commit()
-            conn.close()
+            # The artifact may have moved between categories, so drop every list
+            invalidate_category_cache()
+            refresh_suggestions(conn, 'artifacts', artifact_id)
         except Exception as e:
-            print(f"Error updating artifact: {e}")
+            log.error("Error updating artifact: %s", e)
     
     return redirect(url_for('section_artifacts'))
 
@@ -765,711 +2971,728 @@ def delete_artifact(artifact_id):
     
     if request.method == 'POST':
         try:
-            conn = create_connection()
+            conn = get_db()
             conn.execute('DELETE FROM artifacts WHERE id = ?', (artifact_id,))
             conn.commit()
-            conn.close()
+            invalidate_category_cache()
+            refresh_suggestions(conn, 'artifacts', artifact_id)
         except Exception as e:
-            print(f"Error deleting artifact: {e}")
+            log.error("Error deleting artifact: %s", e)
     
     return redirect(url_for('section_artifacts'))
 
 
-@app.route('/indian_art')
-def indian_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Indian Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Indian Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('indian_art.html', artifacts=artifacts)
-
-
-@app.route('/asian_art')
-def asian_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Asian Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Asian Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('asian_art.html', artifacts=artifacts)
+def get_data_versions(conn):
+    """Return {table: (version, updated_at)} for the versioned tables, read once per request."""
+    if 'data_versions' not in g:
+        g.data_versions = {row['name']: (row['version'], row['updated_at'])
+                           for row in conn.execute("SELECT name, version, updated_at FROM data_versions")}
+    return g.data_versions
 
-@app.route('/arms_and_armor')
-def arms_and_armor():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Arms and Armor'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Arms and Armor artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('arms_and_armor.html', artifacts=artifacts)
-
-@app.route('/egyptian_art')
-def egyptian_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Egyptian Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Egyptian Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('egyptian_art.html', artifacts=artifacts)
 
-@app.route('/islamic_art')
-def islamic_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Islamic Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Islamic Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('islamic_art.html', artifacts=artifacts)
+# Listing pages are streamed, so the first bytes go out while the rest of the
+# page renders. They are paged (see GALLERY_PAGE_SIZE), which keeps each
+# response small. STREAM_LISTINGS=0 renders them in one piece.
+STREAM_LISTINGS = os.getenv('STREAM_LISTINGS', '1') != '0'
+STREAM_BUFFER_SIZE = 16384   # characters of HTML per chunk handed to the server
 
-@app.route('/european_art')
-def european_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'European Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching European Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('european_art.html', artifacts=artifacts)
 
-@app.route('/ancient_american_art')
-def ancient_american_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Ancient American Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Ancient American Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('ancient_american_art.html', artifacts=artifacts)
+def render_listing(template_name, **context):
+    """render_template() for listing pages, streamed when STREAM_LISTINGS is on.
 
-@app.route('/ancient_near_eastern_art')
-def ancient_near_eastern_art():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Ancient Near Eastern Art'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Ancient Near Eastern Art artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('ancient_near_eastern_art.html', artifacts=artifacts)
+    Jinja emits many tiny fragments, so they are joined into
+    STREAM_BUFFER_SIZE chunks before being sent.
+    """
+    if not STREAM_LISTINGS:
+        return render_template(template_name, **context)
 
-@app.route('/medieval_art_and_the_cloisters')
-def medieval_art_and_the_cloisters():
-    conn = create_connection()
-    artifacts = []
-    if conn is not None:
-        try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM artifacts WHERE category = 'Medieval Art and The Cloisters'")
-            artifacts = cursor.fetchall()
-        except Error as e:
-            print(f"Error fetching Medieval Art and The Cloisters artifacts: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('medieval_art_and_the_cloisters.html', artifacts=artifacts)
+    # stream_template() has to be called here, while the request context is active
+    fragments = stream_template(template_name, **context)
 
-@app.route('/caspar_david_friedrich')
-def caspar_david_friedrich():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
+    def chunks():
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Caspar David Friedrich: The Soul of Nature'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
+            buffer, size = [], 0
+            for fragment in fragments:
+                buffer.append(fragment)
+                size += len(fragment)
+                if size >= STREAM_BUFFER_SIZE:
+                    yield ''.join(buffer)
+                    buffer, size = [], 0
+            yield ''.join(buffer)
         finally:
-            conn.close()
-    
-    return render_template('caspar_david_friedrich.html', exhibition=exhibition)
-
-@app.route('/caspar_david_friedrich/objects')
-def exhibit_objects():
-    conn = create_connection()
-    objects_list = []
-
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE creator = ?", ('Caspar David Friedrich',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects.html', objects=objects_list)
-
-@app.route('/monstrous_beauty')
-def monstrous_beauty():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Monstrous Beauty: A Feminist Revision of Chinoiserie'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('monstrous_beauty.html', exhibition=exhibition)
-
-@app.route('/recasting_the_past')
-def recasting_the_past():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Recasting The Past: The Art of Chinese Bronzes, 1100-1900'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('recasting_the_past.html', exhibition=exhibition)
-
-@app.route('/recasting_the_past/objects')
-def exhibit_objects3():
-    conn = create_connection()
-    objects_list = []
-
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE culture = ?", ('China',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects3.html', objects=objects_list)
-
-@app.route('/layered_narratives')
-def layered_narratives():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Layered Narratives: The Northern Renaissance Gallery'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('layered_narratives.html', exhibition=exhibition)
-
-@app.route('/layered_narratives/objects')
-def exhibit_objects2():
-    conn = create_connection()
-    objects_list = []
-
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE creator = ?", ('Layered narratives',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects2.html', objects=objects_list)
-
-@app.route('/cycladic_art')
-def cycladic_art():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Cycladic Art'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('cycladic_art.html', exhibition=exhibition)
-
-@app.route('/cycladic_art/objects')
-def exhibit_objects1():
-    conn = create_connection()
-    objects_list = []
-
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE creator = ?", ('Cycladic Art',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects1.html', objects=objects_list)
-
-
-@app.route('/art_of_commerce')
-def art_of_commerce():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Art of Commerce: Trade Catalogs in Watson Library'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('art_of_commerce.html', exhibition=exhibition)
-
-@app.route('/colorful_korea')
-def colorful_korea():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Colorful Korea: The Lea R. Sneider Collection'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('colorful_korea.html', exhibition=exhibition)
-
-@app.route('/colorful_korea/objects')
-def exhibit_objects4():
-    conn = create_connection()
-    objects_list = []
-
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE culture = ?", ('South Korea',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects4.html', objects=objects_list)
-
-@app.route('/floridas')
-def floridas():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Floridas: Anastasia Samoylova and Walker Evans'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('floridas.html', exhibition=exhibition)
-
-@app.route('/afterlives')
-def afterlives():
-    conn = create_connection()
-    exhibition = None
+            fragments.close()
+    return app.response_class(chunks(), mimetype='text/html')
+
+
+# Rendered public pages, keyed by view, arguments, the query parameters the
+# view reads and the versions of the tables they read. Writes bump the
+# versions, so stale pages are never served; they just age out of the LRU.
+PAGE_CACHE_SIZE = 512
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # total body bytes kept
+PAGE_CACHE_MAX_BODY = 1024 * 1024  # pages bigger than this are not kept
+_page_cache = OrderedDict()
+_page_cache_bytes = 0
+
+
+def _store_page(key, body, mimetype):
+    global _page_cache_bytes
+    if len(body) > PAGE_CACHE_MAX_BODY:
+        return
+    with _cache_lock:
+        old = _page_cache.pop(key, None)
+        if old is not None:
+            _page_cache_bytes -= len(old[0])
+        _page_cache[key] = (body, mimetype)
+        _page_cache_bytes += len(body)
+        while len(_page_cache) > PAGE_CACHE_SIZE or _page_cache_bytes > PAGE_CACHE_MAX_BYTES:
+            _page_cache_bytes -= len(_page_cache.popitem(last=False)[1][0])
+
+
+def _tee_into_cache(chunks, key, mimetype):
+    """Pass a streamed body through, caching a copy once it completes unless it outgrows PAGE_CACHE_MAX_BODY."""
+    try:
+        kept, size = [], 0
+        for chunk in chunks:
+            yield chunk
+            if kept is not None:
+                kept.append(chunk.encode() if isinstance(chunk, str) else chunk)
+                size += len(kept[-1])
+                if size > PAGE_CACHE_MAX_BODY:
+                    kept = None
+        if kept is not None:
+            _store_page(key, b''.join(kept), mimetype)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def _template_build_id():
+    """Fingerprint app.py, the templates and the build manifests so a deploy changes every ETag (same on every worker)."""
+    paths = [os.path.join(app.root_path, 'app.py')]
+    paths += [path for path in (IMAGE_MANIFEST, ASSET_MANIFEST) if os.path.exists(path)]
+    for folder, _, files in os.walk(os.path.join(app.root_path, 'templates')):
+        paths += [os.path.join(folder, name) for name in files]
+    stamp = ';'.join(f"{path}:{os.stat(path).st_mtime_ns}" for path in sorted(paths))
+    return hashlib.sha1(stamp.encode()).hexdigest()[:12]
+
+BUILD_ID = _template_build_id()
+
+
+def _validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Let browsers and the proxy keep the page but revalidate it on every use
+    response.cache_control.no_cache = True
+    return response
+
+
+def cached_page(*tables, query_args=()):
+    """Serve the view's rendered HTML from the page cache while the given tables are unchanged.
+
+    The same table versions drive a strong ETag and Last-Modified, so a
+    conditional revisit is answered with 304 before anything is rendered.
+    Visitors who are logged in (user or admin) always get a fresh render.
+    Only the query parameters named in query_args are part of the key, so
+    made-up ones cannot fill the cache with copies of the same page.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            if 'user_email' in session or 'admin_email' in session:
+                return view(**kwargs)
+            conn = get_db()
+            try:
+                versions = get_data_versions(conn) if conn is not None else None
+            except Error as e:
+                log.error("Error reading data versions: %s", e)
+                versions = None
+            if versions is None:
+                return view(**kwargs)
+
+            key = (view.__name__, tuple(sorted(kwargs.items())),
+                   tuple((name, tuple(request.args.getlist(name))) for name in query_args),
+                   tuple(versions[table][0] for table in tables))
+            etag = hashlib.sha1(f"{BUILD_ID}:{key!r}".encode()).hexdigest()
+            last_modified = datetime.fromtimestamp(max(versions[table][1] for table in tables), timezone.utc)
+
+            # If-None-Match wins over If-Modified-Since when both are sent
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+            if not_modified:
+                return _validators(app.response_class(status=304), etag, last_modified)
+
+            with _cache_lock:
+                cached = _page_cache.get(key)
+                if cached is not None:
+                    _page_cache.move_to_end(key)
+            if cached is not None:
+                body, mimetype = cached
+                response = app.response_class(body, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return _validators(response, etag, last_modified)
+
+            response = make_response(view(**kwargs))
+            if response.status_code == 200:
+                if response.is_streamed:
+                    response.response = _tee_into_cache(response.response, key, response.mimetype)
+                else:
+                    _store_page(key, response.get_data(), response.mimetype)
+                response.headers['X-Cache'] = 'MISS'
+                _validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
+
+
+# Collection galleries: URL slug -> artifacts.category value.
+# Each slug renders templates/<slug>.html and keeps /<slug> as an alias.
+ARTIFACT_CATEGORIES = {
+    'indian_art': 'Indian Art',
+    'asian_art': 'Asian Art',
+    'arms_and_armor': 'Arms and Armor',
+    'egyptian_art': 'Egyptian Art',
+    'islamic_art': 'Islamic Art',
+    'european_art': 'European Art',
+    'ancient_american_art': 'Ancient American Art',
+    'ancient_near_eastern_art': 'Ancient Near Eastern Art',
+    'medieval_art_and_the_cloisters': 'Medieval Art and The Cloisters',
+}
+
+CATEGORY_SLUGS = {category: slug for slug, category in ARTIFACT_CATEGORIES.items()}
+
+# Gallery pages (category galleries and exhibition objects) are keyset-paged
+# like the admin tables, so a page stays the same size however big the
+# catalogue grows. Multiples of three fill the card grid's rows.
+GALLERY_PAGE_SIZE = 60
+GALLERY_MAX_PAGE_SIZE = 120
+GALLERY_QUERY_ARGS = ('after_id', 'before_id', 'limit')
+
+# First gallery page per category, filled on first view and dropped on artifact writes
+_category_cache = {}
+
+
+def invalidate_category_cache(*categories):
+    """Forget cached first pages for the given categories (all of them if none are given)."""
+    with _cache_lock:
+        if not categories:
+            _category_cache.clear()
+        for category in categories:
+            _category_cache.pop(category, None)
+
+
+def get_category_artifacts(conn, category):
+    """Return (rows, page) for the requested page of a category's artifacts; the first page is cached."""
+    first = not any(name in request.args for name in GALLERY_QUERY_ARGS)
+    result = _category_cache.get(category) if first else None
+    if result is None:
+        result = paginate(conn, 'artifacts', '*', 'category = ?', (category,),
+                          GALLERY_PAGE_SIZE, GALLERY_MAX_PAGE_SIZE)
+        if first:
+            with _cache_lock:
+                _category_cache[category] = result
+    return result
+
+
+@app.route('/collections/<category_slug>')
+@cached_page('artifacts', query_args=GALLERY_QUERY_ARGS)
+def collection(category_slug):
+    category = ARTIFACT_CATEGORIES.get(category_slug)
+    if category is None:
+        abort(404)
+
+    conn = get_db()
+    artifacts, page = [], None
     if conn is not None:
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Afterlives: Contemporary Art in the Byzantine Crypt'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
+            artifacts, page = get_category_artifacts(conn, category)
         except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('afterlives.html', exhibition=exhibition)
-
-@app.route('/embracing_color')
-def embracing_color():
-    conn = create_connection()
+            log.error("Error fetching %s artifacts: %s", category, e)
+
+    return render_listing(f'{category_slug}.html', artifacts=artifacts, page=page)
+
+
+# Keep the original gallery URLs (and their url_for endpoints) working
+for _slug in ARTIFACT_CATEGORIES:
+    app.add_url_rule(f'/{_slug}', endpoint=_slug, view_func=collection,
+                     defaults={'category_slug': _slug})
+
+# Exhibitions that have a hand-built page: slug -> exhibit_name. These pages
+# render templates/<slug>.html and keep /<slug> as an alias; every other
+# exhibition is served by the generic exhibition_detail.html.
+EXHIBITION_PAGES = {
+    'caspar_david_friedrich': 'Caspar David Friedrich: The Soul of Nature',
+    'monstrous_beauty': 'Monstrous Beauty: A Feminist Revision of Chinoiserie',
+    'recasting_the_past': 'Recasting The Past: The Art of Chinese Bronzes, 1100-1900',
+    'layered_narratives': 'Layered Narratives: The Northern Renaissance Gallery',
+    'cycladic_art': 'Cycladic Art',
+    'art_of_commerce': 'Art of Commerce: Trade Catalogs in Watson Library',
+    'colorful_korea': 'Colorful Korea: The Lea R. Sneider Collection',
+    'floridas': 'Floridas: Anastasia Samoylova and Walker Evans',
+    'afterlives': 'Afterlives: Contemporary Art in the Byzantine Crypt',
+    'embracing_color': 'Embracing Color: Enamel in Chinese Decorative Arts, 1300–1900',
+    'before_yesterday_we_could_fly': 'Before Yesterday We Could Fly: An Afrofuturist Period Room',
+    'art_of_native_america': 'Art of Native America: The Charles and Valerie Diker Collection',
+    'the_new_art': 'The New Art: American Photography, 1839–1910',
+    'city_and_country': 'City and Country: Selections from the Department of Drawings and Prints',
+    'arts_of_the_ancient_americans': 'Arts of the Ancient Americas',
+    'arts_of_africa': 'Arts of Africa',
+    'the_magical_city': 'The Magical City: George Morrisons New York',
+}
+
+# Exhibition records by slug, kept until update_exhibition/delete_exhibition touch them
+_exhibition_cache = {}
+
+
+def exhibition_slug(conn, exhibit_id):
+    """Return the slug of the exhibition with this id (None if it has none)."""
+    row = conn.execute("SELECT slug FROM exhibitions WHERE id = ?", (exhibit_id,)).fetchone()
+    return row[0] if row else None
+
+
+def invalidate_exhibition_cache(*slugs):
+    """Forget cached exhibition records for the given slugs (all of them if none are given)."""
+    with _cache_lock:
+        if not slugs:
+            _exhibition_cache.clear()
+        for slug in slugs:
+            _exhibition_cache.pop(slug, None)
+
+
+def get_exhibition(conn, slug):
+    """Return the exhibition with this slug as a dict, or None if there is no such exhibition."""
+    exhibition = _exhibition_cache.get(slug)
+    if exhibition is None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM exhibitions WHERE slug = ?", (slug,))
+        row = cursor.fetchone()
+        if row is None:
+            # Misses are not cached so arbitrary URLs cannot grow the cache
+            return None
+        exhibition = dict(row)
+        with _cache_lock:
+            _exhibition_cache[slug] = exhibition
+    return exhibition
+
+
+@app.route('/exhibitions/<slug>')
+@cached_page('exhibitions')
+def exhibition_page(slug):
+    conn = get_db()
     exhibition = None
     if conn is not None:
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Embracing Color: Enamel in Chinese Decorative Arts, 1300–1900'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
+            exhibition = get_exhibition(conn, slug)
         except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('embracing_color.html', exhibition=exhibition)
-
-@app.route('/embracing_color/objects')
-def exhibit_objects7():
-    conn = create_connection()
-    objects_list = []
+            log.error("Error fetching exhibition: %s", e)
 
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE culture = ?", ('Chinese Decoratives',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
+    if slug in EXHIBITION_PAGES:
+        return render_template(f'{slug}.html', exhibition=exhibition)
+    if exhibition is None:
+        abort(404)
+    return render_template('exhibition_detail.html', exhibition=exhibition)
 
-    return render_template('exhibit_objects7.html', objects=objects_list)
 
+# Keep the original exhibition URLs (and their url_for endpoints) working
+for _slug in EXHIBITION_PAGES:
+    app.add_url_rule(f'/{_slug}', endpoint=_slug, view_func=exhibition_page,
+                     defaults={'slug': _slug})
 
-@app.route('/before_yesterday_we_could_fly')
-def before_yesterday_we_could_fly():
-    conn = create_connection()
+@app.route('/exhibitions/<slug>/objects')
+@cached_page('exhibitions', 'exhibition_objects', query_args=GALLERY_QUERY_ARGS)
+def exhibition_objects(slug):
+    conn = get_db()
     exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Before Yesterday We Could Fly: An Afrofuturist Period Room'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('before_yesterday_we_could_fly.html', exhibition=exhibition)
-
-@app.route('/before_yesterday_we_could_fly/objects')
-def exhibit_objects5():
-    conn = create_connection()
-    objects_list = []
+    objects, page = [], None
 
     if conn is not None:
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE culture = ?", ('Europe',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
+            exhibition = get_exhibition(conn, slug)
+            if exhibition is not None:
+                objects, page = paginate(conn, 'exhibition_objects', '*', 'exhibition_id = ?', (exhibition['id'],),
+                                         GALLERY_PAGE_SIZE, GALLERY_MAX_PAGE_SIZE)
         except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects5.html', objects=objects_list)
-
-
-@app.route('/art_of_native_america')
-def art_of_native_america():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Art of Native America: The Charles and Valerie Diker Collection'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('art_of_native_america.html', exhibition=exhibition)
-
-@app.route('/art_of_native_america/objects')
-def exhibit_objects6():
-    conn = create_connection()
-    objects_list = []
-
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibition_objects WHERE culture = ?", ('Native America',))
-            objects = cursor.fetchall()
-            
-            # Convert each row to a dictionary for easier template access
-            objects_list = [dict(row) for row in objects]
-        except Error as e:
-            print(f"Error fetching exhibition objects: {e}")
-        finally:
-            conn.close()
-
-    return render_template('exhibit_objects6.html', objects=objects_list)
-
-
-@app.route('/the_new_art')
-def the_new_art():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'The New Art: American Photography, 1839–1910'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('the_new_art.html', exhibition=exhibition)
+            log.error("Error fetching exhibition objects: %s", e)
+
+    if exhibition is None:
+        abort(404)
+
+    return render_listing('exhibit_objects.html', exhibition=exhibition, objects=objects, page=page)
+
+
+# Keep the original object gallery URLs working
+for _slug in LEGACY_OBJECT_FILTERS:
+    app.add_url_rule(f'/{_slug}/objects', endpoint=f'{_slug}_objects', view_func=exhibition_objects,
+                     defaults={'slug': _slug})
+
+
+# Typeahead: table -> ((column, kind), ...) whose values are suggested
+SUGGEST_SOURCES = {
+    'artifacts': (('item_name', 'Artifact'),),
+    'exhibitions': (('exhibit_name', 'Exhibition'),),
+    'exhibition_objects': (('title', 'Object'), ('creator', 'Creator')),
+}
+SUGGEST_LIMIT = 10
+
+SUGGEST_COLD_WAIT = 0.5  # seconds the first /suggest waits for the initial build before answering
+
+# Sorted (key, label, kind) tuples, one per word start of each distinct label,
+# so "fried" finds "Caspar David Friedrich". _suggest_counts refcounts entries
+# shared by several rows; _suggest_rows remembers each row's entries for removal.
+# _suggest_versions holds the data_versions the index was read at (None until
+# the first build). Rebuilds run on a background thread and swap the new index
+# in when done, so the old one keeps answering meanwhile.
+_suggest_keys = []
+_suggest_counts = {}
+_suggest_rows = {}
+_suggest_versions = None
+_suggest_lock = threading.Lock()
+_suggest_stale = False
+_suggest_builder = None
+_suggest_build_lock = threading.Lock()
+_suggest_built = threading.Event()
+
+
+def _suggest_entries(label, kind):
+    """Return the index entries for one label: the label keyed from the start of each word."""
+    label = ' '.join((label or '').split())
+    lowered = label.casefold()
+    return [(lowered[m.start():], label, kind) for m in re.finditer(r'\w+', lowered)]
+
+
+def _suggest_add(row_key, labels):
+    entries = [entry for label, kind in labels for entry in _suggest_entries(label, kind)]
+    for entry in entries:
+        if _suggest_counts.get(entry, 0) == 0:
+            bisect.insort(_suggest_keys, entry)
+        _suggest_counts[entry] = _suggest_counts.get(entry, 0) + 1
+    if entries:
+        _suggest_rows[row_key] = entries
+
+
+def _suggest_remove(row_key):
+    for entry in _suggest_rows.pop(row_key, ()):
+        _suggest_counts[entry] -= 1
+        if _suggest_counts[entry] == 0:
+            del _suggest_counts[entry]
+            del _suggest_keys[bisect.bisect_left(_suggest_keys, entry)]
+
+
+def build_suggestions(conn):
+    """(Re)build the whole typeahead index from the catalogue tables, then swap it in."""
+    global _suggest_keys, _suggest_counts, _suggest_rows, _suggest_versions
+    counts, rows = {}, {}
+    # One read transaction, so the versions describe exactly the rows indexed
+    conn.execute("BEGIN")
+    try:
+        versions = dict(conn.execute("SELECT name, version FROM data_versions").fetchall())
+        for table, sources in SUGGEST_SOURCES.items():
+            columns = ', '.join(column for column, _ in sources)
+            for row in conn.execute(f"SELECT id, {columns} FROM {table}"):
+                entries = [entry for i, (_, kind) in enumerate(sources)
+                           for entry in _suggest_entries(row[i + 1], kind)]
+                if entries:
+                    rows[(table, row[0])] = entries
+                for entry in entries:
+                    counts[entry] = counts.get(entry, 0) + 1
+    finally:
+        conn.rollback()
+    # One sort at the end is far cheaper than inserting entries one by one
+    keys = sorted(counts)
+    with _suggest_lock:
+        _suggest_keys, _suggest_counts, _suggest_rows, _suggest_versions = keys, counts, rows, versions
+    _suggest_built.set()
 
 
-@app.route('/city_and_country')
-def city_and_country():
+def _rebuild_suggestions():
+    """Background thread: rebuild the index on its own connection until nothing has marked it stale."""
+    global _suggest_stale, _suggest_builder
     conn = create_connection()
-    exhibition = None
-    if conn is not None:
-        try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'City and Country: Selections from the Department of Drawings and Prints'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
-        except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
+    try:
+        while True:
+            with _suggest_build_lock:
+                if not _suggest_stale or conn is None:
+                    _suggest_builder = None
+                    return
+                _suggest_stale = False
+            try:
+                build_suggestions(conn)
+            except Error as e:
+                log.error("Error building suggestions: %s", e)
+    finally:
+        if conn is not None:
             conn.close()
-    
-    return render_template('city_and_country.html', exhibition=exhibition)
 
 
-@app.route('/arts_of_the_ancient_americans')
-def arts_of_the_ancient_americans():
-    conn = create_connection()
-    exhibition = None
-    if conn is not None:
+def refresh_suggestions(conn, table, row_id):
+    """Re-index one row after an admin write (the row is simply dropped if it was deleted)."""
+    if _suggest_versions is None:
+        return  # the first /suggest request builds the index from scratch anyway
+    sources = SUGGEST_SOURCES[table]
+    columns = ', '.join(column for column, _ in sources)
+    row = conn.execute(f"SELECT {columns} FROM {table} WHERE id = ?", (row_id,)).fetchone()
+    version = conn.execute("SELECT version FROM data_versions WHERE name = ?", (table,)).fetchone()[0]
+    with _suggest_lock:
+        _suggest_remove((table, row_id))
+        if row is not None:
+            _suggest_add((table, row_id), [(row[i], kind) for i, (_, kind) in enumerate(sources)])
+        # The write moved the table's counter by one; carry the index along so other
+        # threads do not rebuild it. A bigger gap means some other connection wrote
+        # too, and is left for sync_caches to notice.
+        if _suggest_versions.get(table) == version - 1:
+            _suggest_versions[table] = version
+    if _suggest_builder is not None:
+        invalidate_suggestions()  # a rebuild in flight may have read the table before this write
+
+
+def invalidate_suggestions():
+    """Mark the typeahead index stale and start a background rebuild unless one is already running."""
+    global _suggest_stale, _suggest_builder
+    with _suggest_build_lock:
+        _suggest_stale = True
+        # is_alive() also covers a builder that did not survive a fork
+        if _suggest_builder is None or not _suggest_builder.is_alive():
+            _suggest_builder = threading.Thread(target=_rebuild_suggestions, name='suggest-rebuild', daemon=True)
+            _suggest_builder.start()
+
+
+def suggest(prefix, limit=SUGGEST_LIMIT):
+    """Return up to limit distinct (label, kind) pairs with a word starting with prefix."""
+    prefix = ' '.join(prefix.split()).casefold()
+    if not prefix:
+        return []
+    results, seen = [], set()
+    with _suggest_lock:
+        i = bisect.bisect_left(_suggest_keys, (prefix,))
+        while i < len(_suggest_keys) and len(results) < limit:
+            key, label, kind = _suggest_keys[i]
+            if not key.startswith(prefix):
+                break
+            if (label, kind) not in seen:
+                seen.add((label, kind))
+                results.append({'label': label, 'kind': kind})
+            i += 1
+    return results
+
+
+@app.route('/suggest')
+def suggest_view():
+    q = request.args.get('q', '')[:100]
+    # get_db() also notices catalogue writes made by other workers and starts a rebuild
+    get_db()
+    if _suggest_versions is None:
+        # Nothing to serve yet: start the first build and give it a moment
+        invalidate_suggestions()
+        _suggest_built.wait(SUGGEST_COLD_WAIT)
+    return jsonify(q=q, suggestions=suggest(q))
+
+
+SEARCH_PAGE_SIZE = 20
+# Too common to narrow a search; dropped unless the query has nothing else
+SEARCH_STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in into is it its of on or that the their this to was were with'.split())
+
+# Snippet highlight markers; control characters cannot appear in the escaped output
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03'
+
+SEARCH_QUERY = f"""
+    WITH hits AS (
+        -- FTS5 sorts every match by rank itself; snippet() only runs for the page's rows
+        SELECT rowid AS id, rank, title,
+               snippet(search_index, -1, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 24) AS snippet
+        FROM search_index
+        WHERE search_index MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    )
+    SELECT h.id % {SEARCH_KINDS} AS kind,
+           h.title,
+           h.snippet,
+           a.category AS artifact_category,
+           e.slug AS exhibition_slug,
+           oe.slug AS object_exhibition_slug
+    FROM hits h
+    LEFT JOIN artifacts a ON h.id % {SEARCH_KINDS} = 0 AND a.id = h.id / {SEARCH_KINDS}
+    LEFT JOIN exhibitions e ON h.id % {SEARCH_KINDS} = 1 AND e.id = h.id / {SEARCH_KINDS}
+    LEFT JOIN exhibition_objects o ON h.id % {SEARCH_KINDS} = 2 AND o.id = h.id / {SEARCH_KINDS}
+    LEFT JOIN exhibitions oe ON oe.id = o.exhibition_id
+    ORDER BY h.rank
+"""
+
+
+def fts_query(text):
+    """Turn free text into a safe FTS5 query: every word must match, the last one as a prefix.
+
+    Stopwords are left out, or matched as whole words if the query has nothing else.
+    """
+    words = re.findall(r'\w+', text or '')
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words if word.casefold() not in SEARCH_STOPWORDS]
+    if not terms:
+        return ' '.join(f'"{word}"' for word in words)
+    if words[-1].casefold() not in SEARCH_STOPWORDS:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_result_link(row):
+    """Return the public page a search hit should link to."""
+    if row['kind'] == 0:
+        slug = CATEGORY_SLUGS.get(row['artifact_category'])
+        return url_for('collection', category_slug=slug) if slug else url_for('artifacts')
+    if row['kind'] == 1 and row['exhibition_slug']:
+        return url_for('exhibition_page', slug=row['exhibition_slug'])
+    if row['kind'] == 2 and row['object_exhibition_slug']:
+        return url_for('exhibition_objects', slug=row['object_exhibition_slug'])
+    return url_for('exhibition')
+
+
+@app.route('/search')
+def search():
+    q = request.args.get('q', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+    results = []
+    has_next = False
+
+    match = fts_query(q)
+    conn = get_db()
+    if match and conn is not None:
         try:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Arts of the Ancient Americas'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
+            # Fetch one extra row to know whether there is a next page
+            cursor.execute(SEARCH_QUERY, (match, SEARCH_PAGE_SIZE + 1, (page - 1) * SEARCH_PAGE_SIZE))
+            rows = cursor.fetchall()
+            has_next = len(rows) > SEARCH_PAGE_SIZE
+            for row in rows[:SEARCH_PAGE_SIZE]:
+                snippet = str(escape(row['snippet'] or ''))
+                results.append({
+                    'kind': ('Artifact', 'Exhibition', 'Exhibition Object')[row['kind']],
+                    'title': row['title'],
+                    'snippet': Markup(snippet.replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')),
+                    'url': search_result_link(row),
+                })
         except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('arts_of_the_ancient_americans.html', exhibition=exhibition)
-
-
-@app.route('/arts_of_africa')
-def arts_of_africa():
-    conn = create_connection()
-    exhibition = None
+            log.error("Error searching collection: %s", e)
+
+    return render_template('search.html', q=q, results=results, page=page, has_next=has_next)
+
+
+# Read-only JSON API for the kiosk apps and the mobile site.
+# resource -> (table, fields, fields left out of list calls unless asked for,
+#              query parameter -> SQL condition it filters on)
+API_RESOURCES = {
+    'artifacts': (
+        'artifacts',
+        ('id', 'item_name', 'category', 'origin', 'historical_period', 'location',
+         'image_filename', 'description', 'category_desc'),
+        ('description', 'category_desc'),
+        {'category': 'category = ?', 'origin': 'origin = ?'},
+    ),
+    'exhibitions': (
+        'exhibitions',
+        ('id', 'slug', 'exhibit_name', 'location', 'category', 'image_filename',
+         'start_date', 'end_date', 'opening_time', 'closing_time', 'description'),
+        ('description',),
+        {'category': 'category = ?'},
+    ),
+    'exhibition-objects': (
+        'exhibition_objects',
+        ('id', 'exhibition_id', 'title', 'creator', 'date', 'culture', 'medium', 'dimensions',
+         'credit', 'image_filename', 'description'),
+        ('description',),
+        {'creator': 'creator = ?', 'culture': 'culture = ?',
+         'exhibition': 'exhibition_id = (SELECT id FROM exhibitions WHERE slug = ?)'},
+    ),
+}
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+# Every query parameter the list endpoint reads (page cache keys and next links use only these)
+API_QUERY_ARGS = ('after', 'limit', 'fields') + tuple(sorted(
+    {name for _, _, _, filters in API_RESOURCES.values() for name in filters}))
+
+
+def api_fields(resource, detail=False):
+    """Columns requested with ?fields=a,b (id is always included); raise ValueError on unknown names."""
+    _, fields, heavy, _ = API_RESOURCES[resource]
+    requested = request.args.get('fields')
+    if not requested:
+        return fields if detail else tuple(field for field in fields if field not in heavy)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+    return ('id',) + tuple(name for name in fields if name in names and name != 'id')
+
+
+@app.route('/api/v1/<resource>')
+@cached_page('artifacts', 'exhibitions', 'exhibition_objects', query_args=API_QUERY_ARGS)
+def api_list(resource):
+    """One keyset page of a resource: ?after=<id>&limit=, equality filters and ?fields=."""
+    if resource not in API_RESOURCES:
+        abort(404)
+    table, _, _, filters = API_RESOURCES[resource]
+    try:
+        fields = api_fields(resource)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    limit = max(1, min(request.args.get('limit', API_PAGE_SIZE, type=int), API_MAX_PAGE_SIZE))
+    after = request.args.get('after', 0, type=int)
+
+    conditions, params = ['id > ?'], [after]
+    for name, condition in filters.items():
+        value = request.args.get(name)
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+
+    rows = []
+    conn = get_db()
     if conn is not None:
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'Arts of Africa'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
+            # Filter columns are indexed and secondary indexes carry the rowid,
+            # so every page is a range scan in id order, never an OFFSET skip
+            cursor = conn.execute(
+                f"SELECT {', '.join(fields)} FROM {table} WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?",
+                params + [limit + 1])
+            rows = cursor.fetchall()
         except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('arts_of_africa.html', exhibition=exhibition)
-
+            log.error("Error reading %s for the API: %s", table, e)
+            return jsonify(error='database unavailable'), 503
+
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        args = {name: request.args[name] for name in API_QUERY_ARGS if name in request.args}
+        args['after'] = rows[-1]['id']
+        next_url = url_for('api_list', resource=resource, **args)
+    return jsonify(data=[dict(row) for row in rows], next=next_url)
+
+
+@app.route('/api/v1/<resource>/<int:item_id>')
+@cached_page('artifacts', 'exhibitions', 'exhibition_objects', query_args=('fields',))
+def api_detail(resource, item_id):
+    """A single record, with every field unless ?fields= narrows it."""
+    if resource not in API_RESOURCES:
+        abort(404)
+    table = API_RESOURCES[resource][0]
+    try:
+        fields = api_fields(resource, detail=True)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
 
-@app.route('/the_magical_city')
-def the_magical_city():
-    conn = create_connection()
-    exhibition = None
+    row = None
+    conn = get_db()
     if conn is not None:
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exhibitions WHERE exhibit_name = 'The Magical City: George Morrisons New York'")
-            exhibition = cursor.fetchone()
-            
-            if exhibition:
-                # Convert Row object to dictionary for easier template handling
-                exhibition = dict(exhibition)
+            row = conn.execute(f"SELECT {', '.join(fields)} FROM {table} WHERE id = ?", (item_id,)).fetchone()
         except Error as e:
-            print(f"Error fetching exhibition: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('the_magical_city.html', exhibition=exhibition)
+            log.error("Error reading %s for the API: %s", table, e)
+            return jsonify(error='database unavailable'), 503
+    if row is None:
+        return jsonify(error='not found'), 404
+    return jsonify(data=dict(row))
 
 
 # Your existing routes
@@ -1486,13 +3709,12 @@ def exhibition():
     return render_template('exhibition.html')
 
 @app.route('/events')
+@cached_page('exhibitions')
 def events():
-    conn = create_connection()
+    conn = get_db()
     events = []
     if conn is not None:
         try:
-            # Configure row_factory to return dictionaries
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM exhibitions WHERE category = 'Events'")
             events = cursor.fetchall()
@@ -1500,9 +3722,7 @@ def events():
             # Convert Row objects to dictionaries for easier template handling
             events = [dict(event) for event in events]
         except Error as e:
-            print(f"Error fetching events: {e}")
-        finally:
-            conn.close()
+            log.error("Error fetching events: %s", e)
     
     return render_template('events.html', events=events)
 
@@ -1519,7 +3739,7 @@ def about():
 #     if 'admin_email' not in session:  # Check for admin session
 #         return redirect(url_for('adminLogin'))
     
-#     conn = create_connection()
+#     conn = get_db()
 #     admin = None
 #     error = None
 #     success = None
@@ -0,0 +1,31 @@
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-suggest]').forEach(input => {
+        const list = document.getElementById(input.getAttribute('list'));
+        let timer = null;
+        let lastQuery = '';
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const q = input.value.trim();
+            if (q.length < 2 || q === lastQuery) {
+                return;
+            }
+
+            // Wait for a short pause in typing before asking the server
+            timer = setTimeout(() => {
+                lastQuery = q;
+                fetch('/suggest?q=' + encodeURIComponent(q))
+                    .then(response => response.json())
+                    .then(data => {
+                        list.replaceChildren(...data.suggestions.map(suggestion => {
+                            const option = document.createElement('option');
+                            option.value = suggestion.label;
+                            option.label = suggestion.kind;
+                            return option;
+                        }));
+                    })
+                    .catch(() => {});
+            }, 120);
+        });
+    });
+});
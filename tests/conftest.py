@@ -0,0 +1,76 @@
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ.setdefault('ACCESS_LOG', '0')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+import app as museum  # noqa: E402
+
+SEED_DATABASE = os.path.join(ROOT, 'instance', 'museum.db')
+
+
+def reset_state():
+    """Forget every per-process cache, connection and counter so each test starts cold."""
+    conn = getattr(museum._thread_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+    museum._thread_local.__dict__.clear()
+    museum._schema_ready = False
+    museum._page_cache.clear()
+    museum._page_cache_bytes = 0
+    museum._category_cache.clear()
+    museum._exhibition_cache.clear()
+    museum._buckets.clear()
+    builder = museum._suggest_builder
+    if builder is not None:
+        builder.join()
+    museum._suggest_keys, museum._suggest_counts, museum._suggest_rows = [], {}, {}
+    museum._suggest_versions = None
+    museum._suggest_stale = False
+    museum._suggest_builder = None
+    museum._suggest_built.clear()
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A migrated copy of the seed catalogue that the app reads and writes for this test."""
+    path = str(tmp_path / 'museum.db')
+    shutil.copy(SEED_DATABASE, path)
+    monkeypatch.setattr(museum, 'DATABASE', path)
+    monkeypatch.setitem(museum.app.config, 'WTF_CSRF_ENABLED', False)
+    monkeypatch.setitem(museum.app.config, 'TESTING', True)
+    reset_state()
+    conn = museum.create_connection()
+    museum.migrate_db(conn)
+    conn.close()
+    yield path
+    reset_state()
+
+
+@pytest.fixture
+def client(database):
+    return museum.app.test_client()
+
+
+@pytest.fixture
+def admin(database):
+    client = museum.app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_email'] = 'admin@example.com'
+    return client
+
+
+@pytest.fixture
+def db(database):
+    """A plain connection of the test's own, as another worker would have."""
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
@@ -0,0 +1,71 @@
+import pytest
+
+import app as museum
+
+
+def test_list_pages_through_a_resource_by_id(client, db):
+    expected = [row[0] for row in db.execute("SELECT id FROM artifacts ORDER BY id")]
+    seen, url = [], '/api/v1/artifacts?limit=40'
+    while url:
+        body = client.get(url).get_json()
+        assert len(body['data']) <= 40
+        seen += [item['id'] for item in body['data']]
+        url = body['next']
+    assert seen == expected
+
+
+def test_list_leaves_out_heavy_fields_unless_asked(client):
+    item = client.get('/api/v1/artifacts?limit=1').get_json()['data'][0]
+    assert 'description' not in item
+    item = client.get('/api/v1/artifacts?limit=1&fields=item_name,description').get_json()['data'][0]
+    assert set(item) == {'id', 'item_name', 'description'}
+
+
+def test_filters_are_kept_in_the_next_link(client, db):
+    count = db.execute("SELECT COUNT(*) FROM artifacts WHERE category = 'Asian Art'").fetchone()[0]
+    body = client.get('/api/v1/artifacts?category=Asian+Art&limit=5').get_json()
+    assert {item['category'] for item in body['data']} == {'Asian Art'}
+    assert 'category=Asian+Art' in body['next'] and 'limit=5' in body['next']
+    total = len(body['data'])
+    while body['next']:
+        body = client.get(body['next']).get_json()
+        total += len(body['data'])
+    assert total == count
+
+
+def test_exhibition_objects_filter_by_exhibition_slug(client, db):
+    exhibition = db.execute("SELECT id FROM exhibitions WHERE slug = 'cycladic_art'").fetchone()[0]
+    body = client.get(f'/api/v1/exhibition-objects?exhibition=cycladic_art&limit={museum.API_MAX_PAGE_SIZE}').get_json()
+    assert body['data']
+    assert {item['exhibition_id'] for item in body['data']} == {exhibition}
+
+
+def test_limit_is_capped(client):
+    body = client.get('/api/v1/exhibition-objects?limit=100000').get_json()
+    assert len(body['data']) <= museum.API_MAX_PAGE_SIZE
+
+
+def test_detail_has_every_field(client, db):
+    item = db.execute("SELECT * FROM exhibitions ORDER BY id LIMIT 1").fetchone()
+    body = client.get(f"/api/v1/exhibitions/{item['id']}").get_json()
+    assert body['data'] == {field: item[field] for field in museum.API_RESOURCES['exhibitions'][1]}
+
+
+@pytest.mark.parametrize('url', ['/api/v1/artifacts?fields=item_name,password', '/api/v1/artifacts/1?fields=secret'])
+def test_unknown_fields_are_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert 'unknown field' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('url', ['/api/v1/users', '/api/v1/users/1', '/api/v1/artifacts/999999999'])
+def test_unknown_resources_and_items_are_404(client, url):
+    assert client.get(url).status_code == 404
+
+
+def test_responses_are_revalidated_with_etags(client):
+    response = client.get('/api/v1/artifacts?limit=3')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert client.get('/api/v1/artifacts?limit=3').headers['X-Cache'] == 'HIT'
+    revalidated = client.get('/api/v1/artifacts?limit=3', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
@@ -0,0 +1,74 @@
+import glob
+import gzip
+import hashlib
+import os
+import shutil
+
+import pytest
+
+import app as museum
+
+VENDOR_FONTS = sorted(
+    path for path in glob.glob(os.path.join(museum.app.static_folder, 'vendor', '**', '*'), recursive=True)
+    if path.endswith(museum.FONT_EXTENSIONS))
+
+
+@pytest.mark.parametrize('path', VENDOR_FONTS, ids=os.path.basename)
+def test_vendored_fonts_can_be_subset(path):
+    pytest.importorskip('fontTools.subset')
+    with open(path, 'rb') as f:
+        data = f.read()
+    subset = museum.subset_font(data, os.path.splitext(path)[1], {0x20})
+    assert 0 < len(subset) < len(data)
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    """Run `flask build-assets` against a copy of static/ (without the images) and return the manifest."""
+    static = tmp_path / 'static'
+    shutil.copytree(museum.app.static_folder, static, ignore=shutil.ignore_patterns('images', 'dist'))
+    monkeypatch.setattr(museum.app, 'static_folder', str(static))
+    monkeypatch.setattr(museum, 'ASSET_MANIFEST', str(static / museum.ASSET_DIR / 'manifest.json'))
+    monkeypatch.setattr(museum, '_asset_manifest', None)
+    result = museum.app.test_cli_runner().invoke(args=['build-assets'])
+    assert result.exit_code == 0, result.output
+    return museum.get_asset_manifest()
+
+
+def test_bundles_are_named_after_their_content(built):
+    assert set(museum.ASSET_BUNDLES) <= set(built)
+    for name in museum.ASSET_BUNDLES:
+        path = os.path.join(museum.app.static_folder, museum.ASSET_DIR, built[name])
+        with open(path, 'rb') as f:
+            body = f.read()
+        assert built[name].split('.')[-2] == hashlib.sha256(body).hexdigest()[:10]
+        with open(path + '.gz', 'rb') as f:
+            assert gzip.decompress(f.read()) == body
+
+
+def test_pages_link_the_fingerprinted_bundles(built):
+    with museum.app.test_request_context():
+        assert museum.asset_url('site.css') == f"/static/{museum.ASSET_DIR}/{built['site.css']}"
+
+
+def test_bundles_are_served_precompressed_and_immutable(built):
+    client = museum.app.test_client()
+    url = f"/static/{museum.ASSET_DIR}/{built['site.css']}"
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'Accept-Encoding' in response.headers['Vary']
+    plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_unbuilt_bundles_are_served_from_source(database):
+    with museum.app.test_request_context():
+        url = museum.asset_url('no-such-bundle.css')
+    assert url == '/assets/no-such-bundle.css'
+    client = museum.app.test_client()
+    assert client.get(url).status_code == 404
+    response = client.get('/assets/site.css')
+    assert response.mimetype == 'text/css'
+    assert response.get_data(as_text=True) == museum.bundle_source('site.css')
@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+import app as museum
+
+CSS = '/static/vendor/fontawesome/css/all.min.css'
+
+
+def test_gzip_is_used_when_accepted(client):
+    response = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert b'</html>' in gzip.decompress(response.data)
+
+
+def test_brotli_is_preferred_when_available(client):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/events', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert b'</html>' in brotli.decompress(response.data)
+
+
+def test_identity_when_nothing_is_accepted(client):
+    response = client.get('/events', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'].startswith('"')
+
+
+def test_small_and_binary_responses_are_left_alone(client):
+    response = client.get('/suggest?q=fri', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < museum.COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+    response = client.get('/static/images/exhibition/TheGenesisFacade.jpg', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize('url', ['/events', CSS])
+@pytest.mark.parametrize('encoding', ['gzip', 'identity'])
+def test_not_modified_repeats_the_etag_of_the_full_response(client, url, encoding):
+    response = client.get(url, headers={'Accept-Encoding': encoding})
+    etag = response.headers['ETag']
+    assert etag.startswith('W/') == (encoding == 'gzip')
+    revalidated = client.get(url, headers={'Accept-Encoding': encoding, 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert revalidated.data == b''
+
+
+def test_weak_etag_matches_an_uncompressed_revisit(client):
+    etag = client.get('/events', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert client.get('/events', headers={'If-None-Match': etag}).status_code == 304
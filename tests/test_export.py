@@ -0,0 +1,70 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+import app as museum
+
+
+def parse(fmt, data):
+    text = data.decode('utf-8')
+    if fmt == 'csv':
+        return list(csv.DictReader(io.StringIO(text)))
+    return [json.loads(line) for line in text.splitlines()]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+@pytest.mark.parametrize('table', sorted(museum.EXPORT_COLUMNS))
+def test_download_has_every_row(admin, db, monkeypatch, table, fmt, compress):
+    # Small batches and buffers so the export spans several queries and chunks
+    monkeypatch.setattr(museum, 'EXPORT_BATCH_SIZE', 7)
+    monkeypatch.setattr(museum, 'EXPORT_BUFFER_SIZE', 512)
+    response = admin.get(f'/export/{table}.{fmt}' + ('?gzip=1' if compress else ''))
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-store'
+    disposition = response.headers['Content-Disposition']
+    data = response.data
+    if compress:
+        assert response.mimetype == 'application/gzip'
+        assert disposition.endswith(f'.{fmt}.gz"')
+        data = gzip.decompress(data)
+    else:
+        assert response.mimetype == museum.EXPORT_MIMETYPES[fmt]
+        assert disposition.endswith(f'.{fmt}"')
+
+    rows = parse(fmt, data)
+    expected = db.execute(f"SELECT {', '.join(museum.EXPORT_COLUMNS[table])} FROM {table} ORDER BY id").fetchall()
+    assert [str(row['id']) for row in rows] == [str(row['id']) for row in expected]
+    assert list(rows[0]) == list(museum.EXPORT_COLUMNS[table])
+    if fmt == 'jsonl':
+        assert rows == [dict(row) for row in expected]
+
+
+def test_export_needs_an_admin(client):
+    response = client.get('/export/artifacts.csv')
+    assert response.status_code == 302
+    assert '/adminLogin' in response.headers['Location']
+
+
+@pytest.mark.parametrize('url', ['/export/users.csv', '/export/artifacts.xml'])
+def test_unknown_tables_and_formats_are_404(admin, url):
+    assert admin.get(url).status_code == 404
+
+
+def test_cli_export_round_trips_through_import(db, tmp_path):
+    runner = museum.app.test_cli_runner()
+    path = tmp_path / 'artifacts.csv.gz'
+    result = runner.invoke(args=['export', 'artifacts', str(path)])
+    assert result.exit_code == 0, result.output
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert next(csv.reader(f)) == list(museum.EXPORT_COLUMNS['artifacts'])
+
+    plain = tmp_path / 'artifacts.csv'
+    plain.write_bytes(gzip.decompress(path.read_bytes()))
+    result = runner.invoke(args=['import', 'artifacts', str(plain), '--dry-run', '--skip-image-check'])
+    assert result.exit_code == 0, result.output
+    count = db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+    assert f'Validated {count} of {count}' in result.output
@@ -0,0 +1,62 @@
+import html
+import re
+
+import app as museum
+
+CARD = 'class="card-text'
+
+
+def page_links(response):
+    body = response.get_data(as_text=True)
+    links = {label: html.unescape(href) for href, label in
+             re.findall(r'href="([^"]+)">\s*(?:<i[^>]*></i>\s*)?(Previous|Next)', body)}
+    return body.count(CARD), links
+
+
+def ids(db, category):
+    return [row[0] for row in db.execute("SELECT id FROM artifacts WHERE category = ? ORDER BY id", (category,))]
+
+
+def test_gallery_pages_follow_the_ids(client, db):
+    expected = ids(db, 'Asian Art')
+    url, pages = '/collections/asian_art?limit=4', []
+    while url:
+        cards, links = page_links(client.get(url))
+        pages.append(cards)
+        url = links.get('Next')
+        if url:
+            assert f'after_id={expected[4 * len(pages) - 1]}' in url
+            assert 'limit=4' in url
+    assert pages == [4, 4, 4, len(expected) - 12]
+
+
+def test_previous_link_returns_to_the_page_before(client, db):
+    expected = ids(db, 'Asian Art')
+    _, links = page_links(client.get(f'/collections/asian_art?after_id={expected[7]}&limit=4'))
+    assert f'before_id={expected[8]}' in links['Previous']
+    cards, links = page_links(client.get(links['Previous']))
+    assert cards == 4
+    assert f'after_id={expected[7]}' in links['Next']
+    assert f'before_id={expected[4]}' in links['Previous']
+
+
+def test_first_page_has_no_previous_link(client):
+    cards, links = page_links(client.get('/collections/asian_art'))
+    assert cards <= museum.GALLERY_PAGE_SIZE
+    assert 'Previous' not in links
+
+
+def test_legacy_gallery_urls_page_on_their_own_path(client):
+    _, links = page_links(client.get('/asian_art?limit=4'))
+    assert links['Next'].startswith('/asian_art?')
+
+
+def test_limit_is_capped(client, db):
+    db.executemany("""
+        INSERT INTO artifacts (item_name, category, origin, historical_period, location, image_filename)
+        VALUES (?, 'Asian Art', 'Japan', 'Edo', 'Gallery 9', 'x')
+    """, [(f'Piece {i}',) for i in range(museum.GALLERY_MAX_PAGE_SIZE)])
+    db.commit()
+    cards, links = page_links(client.get('/collections/asian_art?limit=100000'))
+    assert cards == museum.GALLERY_MAX_PAGE_SIZE
+    assert f'limit={museum.GALLERY_MAX_PAGE_SIZE}' in links['Next']
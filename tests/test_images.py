@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import app as museum
+
+PIL = pytest.importorskip('PIL')
+from PIL import Image  # noqa: E402
+
+
+@pytest.fixture
+def static(tmp_path, monkeypatch):
+    """An empty static folder of the test's own, with no derivative manifest yet."""
+    monkeypatch.setattr(museum.app, 'static_folder', str(tmp_path))
+    monkeypatch.setattr(museum, '_image_manifest', None)
+    monkeypatch.setattr(museum, 'IMAGE_MANIFEST', str(tmp_path / 'images' / 'manifest.json'))
+    os.makedirs(tmp_path / 'images' / 'artifacts')
+    return tmp_path
+
+
+def make_image(static, name, size, mode='RGB'):
+    Image.new(mode, size, (200, 120, 40, 128)[:len(mode)]).save(static / 'images' / 'artifacts' / name)
+    return f'images/artifacts/{name}'
+
+
+def test_derivatives_are_never_upscaled(static):
+    path = make_image(static, 'vase.jpg', (1000, 500))
+    entry = museum._build_image_derivatives(path)
+    assert entry['width'] == 1000 and entry['height'] == 500
+    assert [w for w, _ in entry['webp']] == [320, 640, 960]
+    assert [p for _, p in entry['fallback']][0] == 'images/_derived/artifacts/vase-320.jpg'
+    with Image.open(static / entry['webp'][0][1]) as image:
+        assert image.format == 'WEBP' and image.size == (320, 160)
+
+
+def test_small_images_get_one_copy_at_their_own_size(static):
+    entry = museum._build_image_derivatives(make_image(static, 'seal.jpg', (200, 100)))
+    assert [w for w, _ in entry['webp']] == [200]
+
+
+def test_transparent_images_fall_back_to_png(static):
+    entry = museum._build_image_derivatives(make_image(static, 'mask.png', (400, 400), 'RGBA'))
+    assert entry['fallback'][0][1].endswith('.png')
+
+
+def test_unbuilt_images_render_a_plain_lazy_img(static):
+    with museum.app.test_request_context():
+        html = museum.responsive_image('images/artifacts/vase.jpg', alt='A "blue" vase', **{'class': 'card-img'})
+    assert html == ('<img src="/static/images/artifacts/vase.jpg" alt="A &#34;blue&#34; vase" class="card-img"'
+                    ' loading="lazy" decoding="async">')
+
+
+def test_built_images_render_a_picture_with_srcsets(static):
+    path = make_image(static, 'vase.jpg', (700, 700))
+    museum._image_manifest = {path: museum._build_image_derivatives(path)}
+    with museum.app.test_request_context():
+        html = museum.responsive_image(path, alt='Vase')
+    assert html.startswith('<picture')
+    assert ('srcset="/static/images/_derived/artifacts/vase-320.webp 320w, '
+            '/static/images/_derived/artifacts/vase-640.webp 640w"') in html
+    assert 'srcset="/static/images/_derived/artifacts/vase-320.jpg 320w, ' in html
+    assert 'width="700" height="700"' in html
@@ -0,0 +1,85 @@
+import json
+
+import app as museum
+
+OBJECT = {'title': 'Marble bowl', 'creator': 'Cycladic Art', 'date': '2700 BCE', 'credit': 'Gift',
+          'image_filename': 'marble_bowl'}
+ARTIFACT = {'item_name': 'Tea bowl', 'category': 'Asian Art', 'origin': 'Japan', 'historical_period': 'Edo',
+            'location': 'Gallery 9', 'image_filename': 'missing_image'}
+
+
+def run_import(tmp_path, table, records, *args):
+    path = tmp_path / 'rows.jsonl'
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+    rejects = tmp_path / 'rejects.jsonl'
+    result = museum.app.test_cli_runner().invoke(
+        args=['import', table, str(path), '--rejects', str(rejects), *args])
+    assert result.exit_code == 0, result.output
+    errors = [json.loads(line) for line in rejects.read_text().splitlines()] if rejects.exists() else []
+    return result.output, {error['line']: error['error'] for error in errors}
+
+
+def test_rows_that_fail_validation_are_rejected_with_their_reason(tmp_path, db):
+    before = db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+    output, errors = run_import(tmp_path, 'artifacts', [
+        dict(ARTIFACT, image_filename='asian_art_hero2'),
+        dict(ARTIFACT, item_name=''),
+        dict(ARTIFACT, category='Martian Art'),
+        dict(ARTIFACT, image_filename='../secrets'),
+        ARTIFACT,
+    ], '--skip-image-check')
+    assert errors == {
+        2: 'missing item_name',
+        3: "unknown category 'Martian Art'",
+        4: "image_filename '../secrets' must be a plain relative name",
+    }
+    assert 'Imported 2 of 5' in output
+    assert db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0] == before + 2
+
+
+def test_images_must_exist_where_the_page_will_look(tmp_path, database):
+    _, errors = run_import(tmp_path, 'artifacts', [ARTIFACT, dict(ARTIFACT, image_filename='asian_art_hero2')])
+    assert errors == {1: 'image images/artifacts/asian_art/missing_image not found under static/'}
+
+
+def test_exhibition_dates_are_checked(tmp_path, database):
+    show = {'exhibit_name': 'Late Show', 'location': 'Hall', 'category': 'Exhibition', 'image_filename': 'x',
+            'start_date': '2024-05-01', 'end_date': '2024-04-01', 'opening_time': '10:00', 'closing_time': '17:00'}
+    _, errors = run_import(tmp_path, 'exhibitions', [
+        show, dict(show, start_date='May 1st'), dict(show, category='Party')], '--skip-image-check')
+    assert errors == {
+        1: 'end_date is before start_date',
+        2: 'dates must be YYYY-MM-DD and times HH:MM',
+        3: "category must be 'Exhibition' or 'Events', not 'Party'",
+    }
+
+
+def test_objects_name_their_exhibition_by_id_or_slug(tmp_path, db):
+    exhibition = db.execute("SELECT id FROM exhibitions WHERE slug = 'cycladic_art'").fetchone()[0]
+    _, errors = run_import(tmp_path, 'exhibition_objects', [
+        dict(OBJECT, exhibition_id=exhibition),
+        dict(OBJECT, exhibition='cycladic_art'),
+        dict(OBJECT, exhibition='nowhere'),
+        dict(OBJECT, exhibition_id='cycladic_art'),
+        dict(OBJECT, exhibition_id=exhibition, exhibition='cycladic_art'),
+        dict(OBJECT, exhibition='cycladic_art', image_filename='not_there'),
+    ])
+    assert errors == {
+        3: "unknown exhibition 'nowhere'",
+        4: "unknown exhibition id 'cycladic_art'",
+        5: 'give exhibition_id or exhibition, not both',
+        6: 'image images/exhibition/cycladic_art/not_there not found under static/',
+    }
+
+
+def test_unlinked_objects_still_need_an_existing_image(tmp_path, database):
+    _, errors = run_import(tmp_path, 'exhibition_objects', [OBJECT, dict(OBJECT, image_filename='not_there')])
+    assert errors == {2: 'image not_there in any exhibition folder not found under static/'}
+
+
+def test_dry_run_writes_nothing(tmp_path, db):
+    before = db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+    output, errors = run_import(tmp_path, 'artifacts', [ARTIFACT], '--skip-image-check', '--dry-run')
+    assert errors == {}
+    assert 'Validated 1 of 1' in output
+    assert db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0] == before
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import app as museum
+
+PASSWORD = 'Correct#Horse1'
+
+
+@pytest.fixture
+def user(db):
+    """A visitor whose password was stored with cheaper, older hashing parameters."""
+    email = 'visitor@example.com'
+    db.execute("""
+        INSERT INTO users (first_name, last_name, phone_number, email, password, address_line1, city, zip_code)
+        VALUES ('Ada', 'Visitor', '5550100', ?, ?, '1 Main St', 'Springfield', '12345')
+    """, (email, generate_password_hash(PASSWORD, method='pbkdf2:sha256:1000')))
+    db.commit()
+    return email
+
+
+def login(client, email, password='wrong-password', ip='203.0.113.1'):
+    return client.post('/login', data={'email': email, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_account_is_throttled_after_its_burst(client):
+    burst = museum.THROTTLE_ACCOUNT[0]
+    for i in range(burst):
+        # Spread over addresses so only the account bucket runs out
+        assert login(client, 'nobody@example.com', ip=f'203.0.113.{i}').status_code == 200
+    response = login(client, 'nobody@example.com', ip='203.0.113.200')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert login(client, 'somebody@example.com', ip='203.0.113.201').status_code == 200
+
+
+def test_address_is_throttled_across_accounts(client, monkeypatch):
+    monkeypatch.setattr(museum, 'THROTTLE_IP', (3, 0.001))
+    for i in range(3):
+        assert login(client, f'guess{i}@example.com').status_code == 200
+    assert login(client, 'guess9@example.com').status_code == 429
+    assert login(client, 'guess9@example.com', ip='198.51.100.7').status_code == 200
+
+
+def test_throttled_attempts_cost_no_hash(client, user, monkeypatch):
+    monkeypatch.setattr(museum, 'THROTTLE_ACCOUNT', (1, 0.001))
+    calls = []
+    monkeypatch.setattr(museum, 'run_hash', lambda func, *args: calls.append(func) or (False, None))
+    login(client, user)
+    assert login(client, user, PASSWORD).status_code == 429
+    assert len(calls) == 1
+
+
+def test_saturated_hash_pool_answers_503(client, user, monkeypatch):
+    monkeypatch.setattr(museum, '_hash_slots', threading.BoundedSemaphore(1))
+    museum._hash_slots.acquire()
+    response = login(client, user, PASSWORD)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_login_upgrades_an_outdated_hash(client, user, db):
+    response = login(client, user, PASSWORD)
+    assert response.status_code == 302
+    stored = db.execute("SELECT password FROM users WHERE email = ?", (user,)).fetchone()[0]
+    assert stored.split('$', 1)[0] == museum.password_hash_prefix()
+    museum._buckets.clear()
+    assert login(client, user, PASSWORD).status_code == 302
+
+
+def test_bucket_table_is_bounded(monkeypatch):
+    monkeypatch.setattr(museum, 'THROTTLE_MAX_KEYS', 10)
+    museum._buckets.clear()
+    for i in range(25):
+        museum.take_token(('ip', f'192.0.2.{i}'), museum.THROTTLE_IP)
+    assert len(museum._buckets) == 10
+    assert ('ip', '192.0.2.24') in museum._buckets
+    museum._buckets.clear()
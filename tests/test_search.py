@@ -0,0 +1,58 @@
+import html
+import re
+
+import app as museum
+
+
+def titles(response):
+    assert response.status_code == 200
+    return [html.unescape(title) for title in re.findall(r'<h5 class="mb-0">(.*?)</h5>', response.get_data(as_text=True))]
+
+
+def test_first_page_is_the_best_ranked_matches(client, db):
+    expected = [row['title'] for row in db.execute(
+        "SELECT title FROM search_index WHERE search_index MATCH ? ORDER BY rank LIMIT ?",
+        (museum.fts_query('bronze'), museum.SEARCH_PAGE_SIZE))]
+    assert titles(client.get('/search?q=bronze')) == expected
+
+
+def test_newest_rows_are_ranked_with_the_rest(admin, client, db):
+    response = admin.post('/section_artifacts', data={
+        'item_name': 'Bronze bronze', 'category': 'Asian Art', 'origin': 'China', 'historical_period': 'Shang',
+        'location': 'Gallery 9', 'image_filename': 'bronze', 'description': 'A bronze ritual bronze vessel.'})
+    assert response.status_code == 302
+    assert titles(client.get('/search?q=bronze'))[0] == 'Bronze bronze'
+
+
+def test_pages_cover_every_match_once(client, db):
+    total = db.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH ?",
+                       (museum.fts_query('art'),)).fetchone()[0]
+    assert total > museum.SEARCH_PAGE_SIZE * 2
+    seen, page = [], 1
+    while True:
+        response = client.get(f'/search?q=art&page={page}')
+        found = titles(response)
+        assert len(found) == min(museum.SEARCH_PAGE_SIZE, total - len(seen))
+        seen += found
+        if f'page={page + 1}' not in response.get_data(as_text=True):
+            break
+        page += 1
+    assert len(seen) == total
+
+
+def test_snippets_are_escaped_and_highlighted(admin, client):
+    admin.post('/section_artifacts', data={
+        'item_name': 'Zircon <b>cup</b>', 'category': 'Asian Art', 'origin': 'China', 'historical_period': 'Tang',
+        'location': 'Gallery 9', 'image_filename': 'zircon', 'description': 'A <script> zircon cup.'})
+    body = client.get('/search?q=zirc').get_data(as_text=True)
+    assert '<mark>Zircon</mark>' in body or '<mark>zircon</mark>' in body
+    assert '<script> zircon' not in body
+
+
+def test_stopwords_are_dropped_unless_nothing_else_is_left():
+    assert museum.fts_query('the art of') == '"art"'
+    assert museum.fts_query('portrait of a') == '"portrait"'
+    assert museum.fts_query('the') == '"the"'
+    assert museum.fts_query('bronze vase') == '"bronze" "vase"*'
+    assert museum.fts_query('"); DROP') == '"DROP"*'
+    assert museum.fts_query('  ') is None
@@ -0,0 +1,79 @@
+import threading
+
+import app as museum
+
+ARTIFACT = {
+    'item_name': 'Zyzzyva lantern', 'category': 'Asian Art', 'origin': 'Japan', 'historical_period': 'Edo',
+    'location': 'Gallery 9', 'image_filename': 'lantern', 'description': 'A paper lantern.', 'category_desc': '',
+}
+
+
+def labels(client, prefix):
+    return [s['label'] for s in client.get('/suggest', query_string={'q': prefix}).json['suggestions']]
+
+
+def wait_for_rebuild():
+    builder = museum._suggest_builder
+    if builder is not None:
+        builder.join(5)
+
+
+def artifact_id(db, name):
+    return db.execute("SELECT id FROM artifacts WHERE item_name = ?", (name,)).fetchone()[0]
+
+
+def test_cold_start_builds_the_index(client):
+    assert museum._suggest_versions is None
+    assert 'Caspar David Friedrich' in labels(client, 'fried')
+    assert museum._suggest_versions is not None
+
+
+def test_admin_writes_update_the_index_without_a_rebuild(client, admin, db):
+    labels(client, 'a')  # build the index
+    wait_for_rebuild()
+
+    admin.post('/section_artifacts', data=ARTIFACT)
+    assert labels(client, 'zyzz') == ['Zyzzyva lantern']
+    assert museum._suggest_builder is None
+    version = db.execute("SELECT version FROM data_versions WHERE name = 'artifacts'").fetchone()[0]
+    assert museum._suggest_versions['artifacts'] == version
+
+    # A request on another thread (its own connection) must not see the index as stale
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(labels(museum.app.test_client(), 'zyzz')))
+    thread.start()
+    thread.join()
+    assert seen == [['Zyzzyva lantern']]
+    assert museum._suggest_builder is None
+
+    item = artifact_id(db, 'Zyzzyva lantern')
+    admin.post(f'/update_artifact/{item}', data=dict(ARTIFACT, item_name='Quokka lantern'))
+    assert labels(client, 'zyzz') == []
+    assert labels(client, 'quok') == ['Quokka lantern']
+
+    admin.post(f'/delete_artifact/{item}')
+    assert labels(client, 'quok') == []
+    assert museum._suggest_builder is None
+
+
+def test_writes_from_another_connection_rebuild_in_the_background(client, db):
+    labels(client, 'a')
+    wait_for_rebuild()
+    db.execute("INSERT INTO artifacts (item_name, category, origin, historical_period, location, image_filename) "
+               "VALUES ('Xylophone bell', 'Asian Art', 'Java', 'Modern', 'Gallery 2', 'bell')")
+    db.commit()
+
+    # The stale index keeps answering while the rebuild runs, then picks the row up
+    labels(client, 'xylo')
+    wait_for_rebuild()
+    assert labels(client, 'xylo') == ['Xylophone bell']
+
+
+def test_unrelated_writes_keep_the_index(client, db):
+    labels(client, 'a')
+    wait_for_rebuild()
+    db.execute("INSERT INTO users (first_name, last_name, email, password, phone_number, address_line1, city, "
+               "zip_code) VALUES ('Ada', 'Lovelace', 'ada@example.com', 'x', '1', '2', '3', '4')")
+    db.commit()
+    labels(client, 'a')
+    assert museum._suggest_builder is None